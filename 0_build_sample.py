@@ -6,22 +6,27 @@ Phase 0.1: Build POC sample of ~100 tickets
 - Output: poc_sample.csv with ticket_id, vertical, source (seed/random)
 """
 
+import numpy as np
 import pandas as pd
 import re
 import random
 
 from config import (
     PATTERNS_CSV,
-    FULL_TICKET_DATA_CSV as FULL_DATA_CSV,
     DATA_DIR as OUTPUT_DIR,
     POC_SAMPLE_CSV as OUTPUT_FILE,
+    POC_SAMPLE_PARQUET,
     POC_TICKET_IDS_TXT,
     ensure_dirs,
 )
+from utils import load_full_ticket_data
 
 # Set random seed for reproducibility
 random.seed(42)
 
+# Ticket IDs in Patterns.csv are 8 digits starting with 60
+TICKET_ID_RE = re.compile(r'60\d{6}')
+
 def extract_ticket_ids_from_patterns():
     """Parse Patterns.csv and extract all ticket IDs by vertical.
     
@@ -66,17 +71,17 @@ def extract_ticket_ids_from_patterns():
             print(f"Warning: Column {col_idx} not found for {vertical}")
             continue
             
-        for cell in patterns_df[col_idx].dropna():
-            # Extract all numbers that look like ticket IDs (8 digits starting with 60)
-            ids = re.findall(r'60\d{6}', str(cell))
-            seeds[vertical].update(ids)
+        # Extract all numbers that look like ticket IDs in one pass over the column.
+        # Cells are newline-joined so an ID can never span two cells.
+        column_text = "\n".join(patterns_df[col_idx].dropna().astype(str))
+        seeds[vertical].update(TICKET_ID_RE.findall(column_text))
     
     return seeds
 
 
 def load_full_data():
-    """Load the full ticket data CSV."""
-    df = pd.read_csv(FULL_DATA_CSV)
+    """Load the full ticket data (only the columns sampling needs)."""
+    df = load_full_ticket_data(columns=['Ticket ID', 'Brand'])
     
     # Normalize Brand to vertical
     brand_map = {
@@ -84,7 +89,8 @@ def load_full_data():
         'Khoros': 'Khoros', 
         'GFI': 'GFI'
     }
-    df['vertical'] = df['Brand'].map(brand_map)
+    # Map on the categorical so the dict is consulted once per brand, not per row
+    df['vertical'] = df['Brand'].astype('category').map(brand_map)
     
     return df
 
@@ -98,15 +104,20 @@ def build_sample(seed_tickets, full_df, target_total=100):
     
     sample_rows = []
     
+    # Index verticals by ticket ID once (first occurrence wins, as before)
+    # so each seed lookup is a dict hit instead of a full-column scan
+    id_to_vertical = {}
+    for ticket_id, vertical in zip(full_df['Ticket ID'], full_df['vertical']):
+        id_to_vertical.setdefault(ticket_id, vertical)
+
     # First, add all seed tickets
     all_seeds = set()
     for vertical, ticket_ids in seed_tickets.items():
         for tid in ticket_ids:
             tid_int = int(tid)
             # Check if ticket exists in full data
-            match = full_df[full_df['Ticket ID'] == tid_int]
-            if len(match) > 0:
-                actual_vertical = match.iloc[0]['vertical']
+            if tid_int in id_to_vertical:
+                actual_vertical = id_to_vertical[tid_int]
                 sample_rows.append({
                     'ticket_id': tid_int,
                     'vertical': actual_vertical,
@@ -119,13 +130,6 @@ def build_sample(seed_tickets, full_df, target_total=100):
     
     print(f"\nSeed tickets found: {len(sample_rows)}")
     
-    # Count seeds by vertical
-    seed_by_vertical = {}
-    for row in sample_rows:
-        v = row['vertical']
-        seed_by_vertical[v] = seed_by_vertical.get(v, 0) + 1
-    print(f"Seeds by vertical: {seed_by_vertical}")
-    
     # Calculate how many random tickets to add
     remaining = target_total - len(sample_rows)
     if remaining > 0:
@@ -134,12 +138,15 @@ def build_sample(seed_tickets, full_df, target_total=100):
         per_vertical = remaining // len(verticals)
         extra = remaining % len(verticals)  # Distribute remainder to first verticals
 
+        # Partition non-seed tickets by vertical in one pass (row order is kept
+        # within each group, so seeded sampling picks the same tickets)
+        seed_ids = np.fromiter(all_seeds, dtype=np.int64, count=len(all_seeds))
+        candidates = full_df[~np.isin(full_df['Ticket ID'].to_numpy(), seed_ids)]
+        pools = dict(list(candidates.groupby('vertical', sort=False, observed=True)))
+
         for i, vertical in enumerate(verticals):
             # Get tickets from this vertical that aren't already seeds
-            vertical_df = full_df[
-                (full_df['vertical'] == vertical) &
-                (~full_df['Ticket ID'].isin(all_seeds))
-            ]
+            vertical_df = pools.get(vertical, candidates.iloc[:0])
 
             # Add one extra ticket to first 'extra' verticals to reach exact target
             n_for_this_vertical = per_vertical + (1 if i < extra else 0)
@@ -148,15 +155,23 @@ def build_sample(seed_tickets, full_df, target_total=100):
             n_to_add = min(n_for_this_vertical, len(vertical_df))
             if n_to_add > 0:
                 random_sample = vertical_df.sample(n=n_to_add, random_state=42 + i)
-                for _, row in random_sample.iterrows():
-                    sample_rows.append({
-                        'ticket_id': int(row['Ticket ID']),
+                sample_rows.extend(
+                    {
+                        'ticket_id': tid,
                         'vertical': vertical,
                         'pattern_vertical': None,
                         'source': 'random'
-                    })
-    
-    return pd.DataFrame(sample_rows)
+                    }
+                    for tid in random_sample['Ticket ID'].astype(int).tolist()
+                )
+
+    sample_df = pd.DataFrame(sample_rows)
+
+    # Count seeds by vertical
+    seed_by_vertical = sample_df.loc[sample_df['source'] == 'seed', 'vertical'].value_counts().to_dict()
+    print(f"Seeds by vertical: {seed_by_vertical}")
+
+    return sample_df
 
 
 def main():
@@ -201,7 +216,8 @@ def main():
     
     # Save
     sample_df.to_csv(OUTPUT_FILE, index=False)
-    print(f"\n✓ Sample saved to: {OUTPUT_FILE}")
+    sample_df.to_parquet(POC_SAMPLE_PARQUET, compression='zstd', index=False)
+    print(f"\n✓ Sample saved to: {OUTPUT_FILE} (+ {POC_SAMPLE_PARQUET.name})")
 
     # Also save just the ticket IDs for easy reference
     sample_df['ticket_id'].to_csv(POC_TICKET_IDS_TXT, index=False, header=False)
@@ -9,11 +9,8 @@ Phase 0.3: Extract deterministic metrics from CSV for POC sample
 
 import pandas as pd
 
-from config import (
-    POC_SAMPLE_CSV as SAMPLE_FILE,
-    FULL_TICKET_DATA_CSV as FULL_DATA_CSV,
-    POC_CSV_METRICS as OUTPUT_FILE,
-)
+from config import POC_CSV_METRICS as OUTPUT_FILE
+from utils import load_full_ticket_data, load_poc_sample
 
 # Columns to extract from Full_Ticket_Data
 COLUMNS_TO_EXTRACT = [
@@ -71,35 +68,44 @@ def compute_derived_fields(df: pd.DataFrame) -> pd.DataFrame:
 
     # Normalize vertical
     brand_map = {'Ignite': 'IgniteTech', 'Khoros': 'Khoros', 'GFI': 'GFI'}
-    df['vertical'] = df['Brand'].map(brand_map)
+    df['vertical'] = df['Brand'].astype('category').map(brand_map)
+
+    # Coerce all time metrics (seconds) in one block; NaN -> 0
+    seconds = (
+        df[['timeSpentOpenL1', 'timeSpentOpenL2', 'initialResponseTime', 'resolutionTime']]
+        .apply(pd.to_numeric, errors='coerce')
+        .fillna(0)
+    )
 
     # Stage boundary: was ticket handed to BU/L2?
-    # Handle potential NaN in timeSpentOpenL2 for comparison
-    time_spent_l2 = pd.to_numeric(df['timeSpentOpenL2'], errors='coerce').fillna(0)
+    # Level Solved has only a handful of values, so test the categories for 'L2'
+    level_solved = df['Level Solved'].astype('category')
+    l2_levels = [c for c in level_solved.cat.categories if 'l2' in str(c).lower()]
     df['was_handed_to_bu'] = (
         df['firstL2AgentId'].notna() |
-        (time_spent_l2 > 0) |
-        df['Level Solved'].astype(str).str.contains('L2', case=False, na=False)
+        (seconds['timeSpentOpenL2'] > 0) |
+        level_solved.isin(l2_levels)
     )
 
-    # Time in Central Support (L1)
-    df['time_in_central_seconds'] = pd.to_numeric(df['timeSpentOpenL1'], errors='coerce').fillna(0)
-    df['time_in_bu_seconds'] = pd.to_numeric(df['timeSpentOpenL2'], errors='coerce').fillna(0)
-
-    # Convert time metrics to hours for readability
-    df['time_in_central_hours'] = df['time_in_central_seconds'] / 3600
-    df['time_in_bu_hours'] = df['time_in_bu_seconds'] / 3600
-    df['initial_response_hours'] = pd.to_numeric(df['initialResponseTime'], errors='coerce').fillna(0) / 3600
-    df['resolution_hours'] = pd.to_numeric(df['resolutionTime'], errors='coerce').fillna(0) / 3600
+    # Convert time metrics to hours for readability (the raw seconds are
+    # already in timeSpentOpenL1/L2, so no *_seconds copies are written).
+    # Rounded to 3 dp (~4s) so the CSV doesn't carry 17 significant digits.
+    hours = (seconds / 3600).round(3)
+    df['time_in_central_hours'] = hours['timeSpentOpenL1']
+    df['time_in_bu_hours'] = hours['timeSpentOpenL2']
+    df['initial_response_hours'] = hours['initialResponseTime']
+    df['resolution_hours'] = hours['resolutionTime']
 
     # Is this a P1/SEV1?
-    # Convert Priority to string safely to avoid type errors on mixed types
-    priority_is_urgent = df['Priority'].astype(str).str.lower().str.strip() == 'urgent'
-    df['is_high_priority'] = (df['isSev1'] == 1) | priority_is_urgent
+    # Normalize the (few) distinct Priority values rather than every row;
+    # categories may be mixed types, so compare their string form
+    priority = df['Priority'].astype('category')
+    urgent = [c for c in priority.cat.categories if str(c).lower().strip() == 'urgent']
+    df['is_high_priority'] = (df['isSev1'] == 1) | priority.isin(urgent)
 
-    # Has external team / Jira
-    df['has_external_team'] = df['externalTeam'].notna() & (df['externalTeam'].astype(str) != '')
-    df['has_jira'] = df['jiraId'].notna() & (df['jiraId'].astype(str) != '')
+    # Has external team / Jira (comparing to '' directly avoids a str copy of the column)
+    df['has_external_team'] = df['externalTeam'].notna() & df['externalTeam'].ne('')
+    df['has_jira'] = df['jiraId'].notna() & df['jiraId'].ne('')
 
     return df
 
@@ -110,17 +116,14 @@ def main():
     print("=" * 60)
     
     # Load POC sample
-    sample_df = pd.read_csv(SAMPLE_FILE)
+    sample_df = load_poc_sample()
     sample_ticket_ids = set(sample_df['ticket_id'].tolist())
     print(f"\nPOC sample size: {len(sample_ticket_ids)} tickets")
     
-    # Load full data
+    # Load only the sample tickets (row filter and column pruning happen in the
+    # Parquet reader, so the rest of Full_Ticket_Data is never held in memory)
     print("\nLoading Full_Ticket_Data...")
-    full_df = pd.read_csv(FULL_DATA_CSV, low_memory=False)
-    print(f"Total tickets in CSV: {len(full_df)}")
-    
-    # Filter to sample tickets
-    filtered_df = full_df[full_df['Ticket ID'].isin(sample_ticket_ids)].copy()
+    filtered_df = load_full_ticket_data(columns=COLUMNS_TO_EXTRACT, ticket_ids=sample_ticket_ids)
     print(f"Matched in sample: {len(filtered_df)}")
     
     # Select columns (only those that exist)
@@ -7,17 +7,25 @@ Phase 0.4: Extract metrics from ticket_360 content
 - Output: poc_ticket_metrics.csv
 """
 
-import json
+import argparse
+import csv
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from functools import lru_cache, partial
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, FrozenSet, NamedTuple, Optional, Tuple
+import orjson
 import pandas as pd
 
 from config import (
     RAW_DIR,
     POC_TICKET_METRICS as OUTPUT_FILE,
     TAGGED_DIR,
+    TAGGED_ARCHIVE,
     ensure_dirs,
 )
 
@@ -43,52 +51,123 @@ AI_NAMES_SUBSTRING = {
     "adn support",
 }
 
-# Pre-compiled regex patterns for exact AI name matching (word boundaries)
-AI_NAME_PATTERNS = [re.compile(rf"\b{re.escape(name)}\b", re.IGNORECASE) for name in AI_NAMES_EXACT]
+# Pre-compiled matcher for all AI names in one alternation, so a name is
+# scanned once: exact names need word boundaries (case-insensitive, as
+# before), substring names match anywhere in the lowercased name
+AI_NAME_RE = re.compile(
+    r"(?i:\b(?:" + "|".join(map(re.escape, sorted(AI_NAMES_EXACT))) + r")\b)"
+    + "".join("|" + re.escape(name) for name in sorted(AI_NAMES_SUBSTRING))
+)
 
-# Patterns to extract actor names from interaction text
-ACTOR_PATTERNS = [
-    re.compile(r"Kayako\s+-\s+ticket\s+id\s+\d+\s+//\s+([^/]+?)\s+commented\s+(privately|publicly):", re.IGNORECASE),
-    re.compile(r"SaaS\s+Jira\s+-\s+issue\s+key\s+[A-Z]+-\d+\s+//\s+([^/]+?)\s+commented:", re.IGNORECASE),
-    re.compile(r"GHI\s+Engineering\s+-\s+\d+\s+//\s+([^/]+?)\s+(commented|subscribed)", re.IGNORECASE),
-]
+# AI subtype markers (matched against lowercased text). One alternation finds
+# the first marker; Atlas still wins if it appears anywhere after a Hermes hit.
+AI_SUBTYPE_RE = re.compile(r'\b(atlas|hermes)\b')
+ATLAS_RE = re.compile(r'\batlas\b')
+
+# Pattern to extract actor names from interaction text: one alternation over
+# the Kayako / SaaS Jira / GHI headers so each text is scanned once
+ACTOR_RE = re.compile(
+    r"Kayako\s+-\s+ticket\s+id\s+\d+\s+//\s+(?P<kayako>[^/]+?)\s+commented\s+(?:privately|publicly):"
+    r"|SaaS\s+Jira\s+-\s+issue\s+key\s+[A-Z]+-\d+\s+//\s+(?P<jira>[^/]+?)\s+commented:"
+    r"|GHI\s+Engineering\s+-\s+\d+\s+//\s+(?P<ghi>[^/]+?)\s+(?:commented|subscribed)",
+    re.IGNORECASE,
+)
+
+# Content indicators, compiled once at import. Matched against the lowercased
+# preview text. Keywords and previous-ticket phrases are single alternations
+# (one scan per ticket); repeated-info patterns stay separate because the
+# metric counts how many distinct patterns hit.
+FRUSTRATION_KEYWORDS = ['frustrated', 'frustrating', 'disappointed', 'unacceptable', 'terrible', 'awful', 'worst', 'ridiculous']
+FRUSTRATION_RE = re.compile('|'.join(map(re.escape, FRUSTRATION_KEYWORDS)))
+
+PREV_TICKET_PATTERNS = [r'ticket\s*#?\d+', r'previous ticket', r'earlier ticket', r'as i mentioned before', r'already told', r'already provided']
+PREV_TICKET_RE = re.compile('|'.join(f'(?:{p})' for p in PREV_TICKET_PATTERNS))
+
+REPEATED_INFO_PATTERNS = [re.compile(p) for p in [r'please provide.*again', r'can you share.*again', r'need.*logs', r'send.*har', r'attach.*screenshot']]
+
+
+@dataclass
+class TaggedInteraction:
+    """One interaction after tagging (serialized as-is to the tagged JSON)."""
+    # Hand-written: dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        "index", "actor_name", "actor_type", "ai_subtype",
+        "timestamp", "timestamp_str", "text_preview", "text_length",
+    )
+    index: int
+    actor_name: Optional[str]
+    actor_type: str
+    ai_subtype: Optional[str]
+    timestamp: Optional[datetime]
+    timestamp_str: str
+    text_preview: str
+    text_length: int
 
 
 def extract_actor_name(text: str) -> Optional[str]:
     """Extract the actor name from interaction text."""
-    for pattern in ACTOR_PATTERNS:
-        match = pattern.search(text)
-        if match:
-            return match.group(1).strip()
+    match = ACTOR_RE.search(text)
+    if match:
+        return (match.group('kayako') or match.group('jira') or match.group('ghi')).strip()
     return None
 
 
-def classify_actor(name: Optional[str], requester_email: Optional[str] = None, requester_name: Optional[str] = None) -> str:
-    """Classify an actor as AI, Employee, Customer, or General."""
+class Requester(NamedTuple):
+    """Ticket requester, lowercased and tokenized once per ticket (hashable, so
+    it can be part of classify_actor's cache key). Fields are None when the
+    requester has no name / email."""
+    name_lower: Optional[str]
+    name_words: FrozenSet[str]
+    email_name: Optional[str]  # email local part, '.' -> ' '
+    email_words: FrozenSet[str]
+
+
+def make_requester(requester_email: Optional[str] = None, requester_name: Optional[str] = None) -> Requester:
+    """Precompute the requester fields classify_actor compares against."""
+    name_lower = requester_name.lower().strip() if requester_name else None
+    email_name = requester_email.split('@')[0].lower().replace('.', ' ') if requester_email else None
+    return Requester(
+        name_lower=name_lower,
+        name_words=frozenset(name_lower.split()) if name_lower else frozenset(),
+        email_name=email_name,
+        email_words=frozenset(email_name.split()) if email_name else frozenset(),
+    )
+
+
+NO_REQUESTER = make_requester()
+
+
+@lru_cache(maxsize=8192)
+def classify_actor(name: Optional[str], requester: Requester = NO_REQUESTER) -> str:
+    """Classify an actor as AI, Employee, Customer, or General.
+
+    Memoized: the same few actors recur throughout a ticket, and all
+    arguments are hashable.
+    """
     if not name:
         return "General"
 
     name_lower = name.lower().strip()
 
-    # Check if AI first (highest priority)
-    # 1. Check exact match names using word boundaries (prevents "Atlas Corp" -> AI)
-    for pattern in AI_NAME_PATTERNS:
-        if pattern.search(name_lower):
-            return "AI"
-    # 2. Check substring match names (longer/unique names safe for substring)
-    for ai_name in AI_NAMES_SUBSTRING:
-        if ai_name in name_lower:
-            return "AI"
+    # Check if AI first (highest priority): exact names with word boundaries
+    # (prevents "Atlassian" -> AI) or substring names (longer/unique names)
+    if AI_NAME_RE.search(name_lower):
+        return "AI"
+
+    # Word overlap (Case 2 below) only applies to multi-word requester
+    # names / emails, so single-word requesters skip tokenizing the actor
+    if len(requester.name_words) >= 2 or len(requester.email_words) >= 2:
+        name_words = set(name_lower.split())
+    else:
+        name_words = set()
 
     # Check if customer (matches requester name or email)
     # Stricter matching to avoid false positives with common names
-    if requester_name:
-        req_name_lower = requester_name.lower().strip()
-        req_words = set(req_name_lower.split())
-        name_words = set(name_lower.split())
+    if requester.name_lower is not None:
+        req_words = requester.name_words
 
         # Case 1: Exact full name match (always accept)
-        if req_name_lower == name_lower:
+        if requester.name_lower == name_lower:
             return "Customer"
 
         # Case 2: Multi-word names with high overlap
@@ -99,13 +178,11 @@ def classify_actor(name: Optional[str], requester_email: Optional[str] = None, r
             if overlap >= 2 and overlap / min_words >= 0.8:
                 return "Customer"
 
-    if requester_email:
-        req_email_name = requester_email.split('@')[0].lower().replace('.', ' ')
-        req_words = set(req_email_name.split())
-        name_words = set(name_lower.split())
+    if requester.email_name is not None:
+        req_words = requester.email_words
 
         # Case 1: Exact match of email prefix (e.g., "john.smith" == "john smith")
-        if req_email_name == name_lower:
+        if requester.email_name == name_lower:
             return "Customer"
 
         # Case 2: Multi-word email prefix with high overlap
@@ -131,11 +208,16 @@ def get_ai_subtype(text: str) -> Optional[str]:
     """
     text_lower = text.lower()
     # Use word boundaries to match AI names precisely
-    if re.search(r'\batlas\b', text_lower):
+    match = AI_SUBTYPE_RE.search(text_lower)
+    if match is None:
+        return None
+    if match.group(1) == 'atlas' or ATLAS_RE.search(text_lower, match.end()):
         return 'Atlas'
-    if re.search(r'\bhermes\b', text_lower):
-        return 'Hermes'
-    return None
+    return 'Hermes'
+
+
+# strptime fallbacks for timestamps fromisoformat rejects on older Pythons
+TIMESTAMP_FORMATS = ["%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]
 
 
 def parse_timestamp(ts_str: str) -> Optional[datetime]:
@@ -143,9 +225,9 @@ def parse_timestamp(ts_str: str) -> Optional[datetime]:
     if not ts_str:
         return None
     try:
-        # Remove timezone offset for parsing (we'll treat all as UTC)
+        # Remove timezone offset for parsing (we'll treat all as UTC); done by
+        # hand because fromisoformat only accepts Z/+0000 from Python 3.11
         ts_clean = ts_str.strip()
-        # Handle common timezone formats
         if ts_clean.endswith('+00:00'):
             ts_clean = ts_clean[:-6]
         elif ts_clean.endswith('+0000'):
@@ -153,13 +235,25 @@ def parse_timestamp(ts_str: str) -> Optional[datetime]:
         elif ts_clean.endswith('Z'):
             ts_clean = ts_clean[:-1]  # Remove exactly one trailing Z
 
-        # Try common formats (without Z suffix since we stripped it)
-        for fmt in ["%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]:
-            try:
-                return datetime.strptime(ts_clean, fmt)
-            except ValueError:
-                continue
-        return None
+        # Date and time are required (date-only strings are not timestamps)
+        if len(ts_clean) < 19:
+            return None
+        # Fast path: single C-level ISO-8601 parse
+        try:
+            ts = datetime.fromisoformat(ts_clean)
+        except ValueError:
+            # Before Python 3.11, fromisoformat rejects fractional seconds
+            # other than 3 or 6 digits; the original formats still accept them
+            for fmt in TIMESTAMP_FORMATS:
+                try:
+                    return datetime.strptime(ts_clean, fmt)
+                except ValueError:
+                    continue
+            return None
+        # Any other UTC offset is left unparsed, as before
+        if ts.tzinfo is not None:
+            return None
+        return ts
     except Exception:
         return None
 
@@ -167,8 +261,7 @@ def parse_timestamp(ts_str: str) -> Optional[datetime]:
 def process_ticket(ticket_path: Path) -> Dict:
     """Process a single ticket JSON and extract metrics."""
     
-    with open(ticket_path, 'r') as f:
-        data = json.load(f)
+    data = orjson.loads(ticket_path.read_bytes())
     
     # Extract ticket ID
     ticket_id = ticket_path.stem.replace('ticket_', '')
@@ -190,8 +283,8 @@ def process_ticket(ticket_path: Path) -> Dict:
     # Get interactions - structure is payload.ticket.interactions as list of [timestamp, text]
     raw_interactions = ticket_data.get('interactions', [])
     
-    # Tag each interaction - format is [timestamp, text] or just a list
-    tagged_interactions = []
+    # Split interactions into columns - format is [timestamp, text] or a dict
+    indices, timestamp_strs, texts = [], [], []
     for i, interaction in enumerate(raw_interactions):
         # Handle [timestamp, text] format
         if isinstance(interaction, list) and len(interaction) >= 2:
@@ -202,28 +295,38 @@ def process_ticket(ticket_path: Path) -> Dict:
             timestamp_str = interaction.get('timestamp', '') or interaction.get('created_at', '')
         else:
             continue
-        
-        # Extract actor
-        actor_name = extract_actor_name(text)
-        actor_type = classify_actor(actor_name, requester_email, requester_name)
-        ai_subtype = get_ai_subtype(text) if actor_type == 'AI' else None
-        
-        # Parse timestamp
-        timestamp = parse_timestamp(timestamp_str)
-        
-        tagged_interactions.append({
-            'index': i,
-            'actor_name': actor_name,
-            'actor_type': actor_type,
-            'ai_subtype': ai_subtype,
-            'timestamp': timestamp,
-            'timestamp_str': timestamp_str,
-            'text_preview': text[:200] if text else '',
-            'text_length': len(text) if text else 0,
-        })
-    
-    # Compute metrics from tagged interactions
-    metrics = compute_interaction_metrics(tagged_interactions)
+        indices.append(i)
+        timestamp_strs.append(timestamp_str)
+        texts.append(text)
+
+    # Tag column-at-a-time: each step is one map over the whole ticket
+    actor_names = list(map(extract_actor_name, texts))
+    requester = make_requester(requester_email, requester_name)
+    actor_types = [classify_actor(name, requester) if name else "General"
+                   for name in actor_names]
+    ai_subtypes = [get_ai_subtype(text) if actor_type == 'AI' else None
+                   for text, actor_type in zip(texts, actor_types)]
+    timestamps = list(map(parse_timestamp, timestamp_strs))
+    previews = [text[:200] if text else '' for text in texts]
+
+    tagged_interactions = [
+        TaggedInteraction(
+            index=i,
+            actor_name=actor_name,
+            actor_type=actor_type,
+            ai_subtype=ai_subtype,
+            timestamp=timestamp,
+            timestamp_str=timestamp_str,
+            text_preview=preview,
+            text_length=len(text) if text else 0,
+        )
+        for i, actor_name, actor_type, ai_subtype, timestamp, timestamp_str, preview, text in zip(
+            indices, actor_names, actor_types, ai_subtypes, timestamps, timestamp_strs, previews, texts
+        )
+    ]
+    
+    # Compute metrics straight from the columns
+    metrics = compute_interaction_metrics(actor_types, ai_subtypes, timestamps, previews)
     metrics['ticket_id'] = int(ticket_id)
     metrics['total_interactions'] = len(tagged_interactions)
     metrics['product_code'] = metadata.get('product', '')
@@ -231,8 +334,46 @@ def process_ticket(ticket_path: Path) -> Dict:
     return metrics, tagged_interactions
 
 
-def compute_interaction_metrics(interactions: List[Dict]) -> Dict:
-    """Compute metrics from tagged interactions."""
+def process_and_save(
+    ticket_path: Path, per_ticket_files: bool = True
+) -> Tuple[Optional[Dict], Optional[List[TaggedInteraction]], Optional[str]]:
+    """
+    Process one ticket and save its tagged interactions (runs in a worker process).
+
+    With per_ticket_files, the tagged interactions are written to TAGGED_DIR here
+    and not sent back; otherwise they are returned for the combined archive.
+
+    Returns (metrics, tagged, None) on success or (None, None, error message) on
+    failure, so one bad file doesn't abort the whole pool.
+    """
+    try:
+        metrics, tagged = process_ticket(ticket_path)
+
+        if not per_ticket_files:
+            return metrics, tagged, None
+
+        # Save tagged interactions (orjson serializes the dataclasses natively;
+        # datetimes go through str() to keep the "YYYY-MM-DD HH:MM:SS" format)
+        tagged_file = TAGGED_DIR / f"{ticket_path.stem}_tagged.json"
+        with open(tagged_file, 'wb') as f:
+            f.write(orjson.dumps(
+                tagged, default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME,
+            ))
+
+        return metrics, None, None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def compute_interaction_metrics(
+    actor_types: List[str],
+    ai_subtypes: List[Optional[str]],
+    timestamps: List[Optional[datetime]],
+    previews: List[str],
+) -> Dict:
+    """Compute metrics from tagged interactions, given as parallel columns
+    (one entry per interaction, in stored order)."""
     
     metrics = {
         # Counts by actor type
@@ -250,7 +391,7 @@ def compute_interaction_metrics(interactions: List[Dict]) -> Dict:
         'last_interaction_ts': None,
         'time_to_first_human_seconds': None,
         'time_to_first_ai_seconds': None,
-        'max_gap_seconds': 0,
+        'max_gap_seconds': 0.0,
         'gaps_over_24h': 0,
         'gaps_over_48h': 0,
         
@@ -265,100 +406,154 @@ def compute_interaction_metrics(interactions: List[Dict]) -> Dict:
         'has_repeated_info_request': False,
     }
     
-    if not interactions:
+    if not actor_types:
         return metrics
     
-    # Count by actor type
-    for inter in interactions:
-        actor = inter['actor_type']
+    # Single pass in stored order: counts, AI streaks and timestamped entries
+    # (plus whether they are already in time order).
+    # Any non-AI interaction breaks a streak; only Employee/Customer end the
+    # opening AI run (General interactions are skipped over there).
+    ai_count = employee_count = customer_count = general_count = 0
+    atlas_count = hermes_count = 0
+    current_ai_streak = max_ai_streak = start_ai_count = 0
+    at_start = True
+    timed = []
+    ascending = descending = True
+    prev_ts = None
+    for actor, ai_subtype, ts in zip(actor_types, ai_subtypes, timestamps):
         if actor == 'AI':
-            metrics['ai_count'] += 1
-            if inter['ai_subtype'] == 'Atlas':
-                metrics['atlas_count'] += 1
-            elif inter['ai_subtype'] == 'Hermes':
-                metrics['hermes_count'] += 1
-        elif actor == 'Employee':
-            metrics['employee_count'] += 1
-        elif actor == 'Customer':
-            metrics['customer_count'] += 1
+            ai_count += 1
+            if ai_subtype == 'Atlas':
+                atlas_count += 1
+            elif ai_subtype == 'Hermes':
+                hermes_count += 1
+            current_ai_streak += 1
+            if current_ai_streak > max_ai_streak:
+                max_ai_streak = current_ai_streak
+            if at_start:
+                start_ai_count += 1
         else:
-            metrics['general_count'] += 1
+            current_ai_streak = 0
+            if actor == 'Employee':
+                employee_count += 1
+                at_start = False
+            elif actor == 'Customer':
+                customer_count += 1
+                at_start = False
+            else:
+                general_count += 1
+
+        if ts:
+            if prev_ts is not None:
+                if ts < prev_ts:
+                    ascending = False
+                if ts >= prev_ts:
+                    descending = False
+            prev_ts = ts
+            timed.append((ts, actor))
+
+    metrics['ai_count'] = ai_count
+    metrics['employee_count'] = employee_count
+    metrics['customer_count'] = customer_count
+    metrics['general_count'] = general_count
+    metrics['atlas_count'] = atlas_count
+    metrics['hermes_count'] = hermes_count
+    metrics['max_consecutive_ai'] = max_ai_streak
+    metrics['ai_streak_at_start'] = start_ai_count > 2
     
-    # Timeline analysis
-    timestamped = [i for i in interactions if i['timestamp']]
-    if timestamped:
-        sorted_by_time = sorted(timestamped, key=lambda x: x['timestamp'])
-        
-        metrics['first_interaction_ts'] = sorted_by_time[0]['timestamp'].isoformat()
-        metrics['last_interaction_ts'] = sorted_by_time[-1]['timestamp'].isoformat()
-        
-        # Time to first human response
-        first_human = next((i for i in sorted_by_time if i['actor_type'] == 'Employee'), None)
-        if first_human and sorted_by_time[0]['timestamp']:
-            delta = first_human['timestamp'] - sorted_by_time[0]['timestamp']
-            metrics['time_to_first_human_seconds'] = delta.total_seconds()
-        
-        # Time to first AI response
-        first_ai = next((i for i in sorted_by_time if i['actor_type'] == 'AI'), None)
-        if first_ai and sorted_by_time[0]['timestamp']:
-            delta = first_ai['timestamp'] - sorted_by_time[0]['timestamp']
-            metrics['time_to_first_ai_seconds'] = delta.total_seconds()
+    # Timeline analysis (stable sort by timestamp, untimestamped dropped)
+    if timed:
+        # Tickets are stored newest-first, so usually a reverse (or nothing)
+        # gives the same order as the stable sort
+        if ascending:
+            pass
+        elif descending:
+            timed.reverse()
+        else:
+            timed.sort(key=itemgetter(0))
+
+        first_ts = timed[0][0]
+        # Kept as datetimes (typed in the Parquet copy); the CSV writer formats them
+        metrics['first_interaction_ts'] = first_ts
+        metrics['last_interaction_ts'] = timed[-1][0]
         
-        # Gap analysis
+        # One pass in time order: first human/AI, AI before first human, gaps.
         # Note: gaps_over_24h counts gaps BETWEEN 24h and 48h only
         # gaps_over_48h counts gaps OVER 48h only (mutually exclusive)
-        for i in range(1, len(sorted_by_time)):
-            gap = (sorted_by_time[i]['timestamp'] - sorted_by_time[i-1]['timestamp']).total_seconds()
+        first_human_ts = first_ai_ts = None
+        ai_before_human = 0
+        prev_ts = first_ts
+        for ts, actor in timed:
+            if actor == 'Employee':
+                if first_human_ts is None:
+                    first_human_ts = ts
+            elif actor == 'AI':
+                if first_ai_ts is None:
+                    first_ai_ts = ts
+                if first_human_ts is None:
+                    ai_before_human += 1
+
+            gap = (ts - prev_ts).total_seconds()
+            prev_ts = ts
             if gap > metrics['max_gap_seconds']:
                 metrics['max_gap_seconds'] = gap
             if gap > 48 * 3600:
                 metrics['gaps_over_48h'] += 1
             elif gap > 24 * 3600:
                 metrics['gaps_over_24h'] += 1
-        
-        # AI before first human
-        first_human_idx = next((i for i, x in enumerate(sorted_by_time) if x['actor_type'] == 'Employee'), len(sorted_by_time))
-        metrics['ai_only_before_human'] = sum(1 for x in sorted_by_time[:first_human_idx] if x['actor_type'] == 'AI')
-    
-    # Max consecutive AI
-    current_ai_streak = 0
-    max_ai_streak = 0
-    for inter in interactions:
-        if inter['actor_type'] == 'AI':
-            current_ai_streak += 1
-            max_ai_streak = max(max_ai_streak, current_ai_streak)
-        else:
-            current_ai_streak = 0
-    metrics['max_consecutive_ai'] = max_ai_streak
-    
-    # AI streak at start
-    start_ai_count = 0
-    for inter in interactions:
-        if inter['actor_type'] == 'AI':
-            start_ai_count += 1
-        elif inter['actor_type'] in ('Employee', 'Customer'):
-            break
-    metrics['ai_streak_at_start'] = start_ai_count > 2
+
+        if first_human_ts is not None:
+            metrics['time_to_first_human_seconds'] = (first_human_ts - first_ts).total_seconds()
+        if first_ai_ts is not None:
+            metrics['time_to_first_ai_seconds'] = (first_ai_ts - first_ts).total_seconds()
+        metrics['ai_only_before_human'] = ai_before_human
     
     # Content keyword detection (basic)
-    all_text = ' '.join(i.get('text_preview', '') for i in interactions).lower()
+    all_text = ' '.join(previews).lower()
     
-    frustration_keywords = ['frustrated', 'frustrating', 'disappointed', 'unacceptable', 'terrible', 'awful', 'worst', 'ridiculous']
-    metrics['has_customer_frustration_keywords'] = any(kw in all_text for kw in frustration_keywords)
+    metrics['has_customer_frustration_keywords'] = FRUSTRATION_RE.search(all_text) is not None
     
     # Previous ticket reference
-    prev_ticket_patterns = [r'ticket\s*#?\d+', r'previous ticket', r'earlier ticket', r'as i mentioned before', r'already told', r'already provided']
-    metrics['has_previous_ticket_reference'] = any(re.search(p, all_text) for p in prev_ticket_patterns)
-    
-    # Repeated info requests
-    repeated_patterns = [r'please provide.*again', r'can you share.*again', r'need.*logs', r'send.*har', r'attach.*screenshot']
-    info_requests = sum(1 for p in repeated_patterns if re.search(p, all_text))
+    metrics['has_previous_ticket_reference'] = PREV_TICKET_RE.search(all_text) is not None
+    
+    # Repeated info requests (two distinct patterns are enough, so stop there)
+    info_requests = 0
+    for pattern in REPEATED_INFO_PATTERNS:
+        if pattern.search(all_text):
+            info_requests += 1
+            if info_requests > 1:
+                break
     metrics['has_repeated_info_request'] = info_requests > 1
     
     return metrics
 
 
+# Columns reduced for the printed summary in main()
+SUMMARY_SUM_COLS = [
+    'total_interactions', 'ai_count', 'atlas_count', 'hermes_count',
+    'employee_count', 'customer_count', 'ai_streak_at_start',
+    'has_customer_frustration_keywords', 'has_previous_ticket_reference',
+    'has_repeated_info_request',
+]
+SUMMARY_MEAN_COLS = ['max_gap_seconds', 'max_consecutive_ai', 'ai_only_before_human']
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Extract metrics from ticket_360 content.")
+    p.add_argument(
+        "--tagged-output",
+        choices=["files", "parquet"],
+        default="files",
+        help="Write tagged interactions as one JSON file per ticket (default) "
+             f"or as a single Parquet archive ({TAGGED_ARCHIVE.name})",
+    )
+    return p.parse_args()
+
+
 def main():
+    args = parse_args()
+    per_ticket_files = args.tagged_output == "files"
+
     print("=" * 60)
     print("Phase 0.4: Extract Ticket_360 Metrics")
     print("=" * 60)
@@ -374,28 +569,46 @@ def main():
         print("No raw files found. Run 1_fetch_tickets.py first.")
         return
     
-    # Process each ticket
+    # Process tickets in parallel (each is independent and CPU-bound);
+    # map() yields results in file order, so the output order is unchanged.
+    # CSV rows are written as results arrive (rows are flat dicts with
+    # identical keys, so they go straight out rather than through the
+    # DataFrame's formatter; timestamps are rendered as ISO-8601 only here)
     all_metrics = []
-    for i, ticket_path in enumerate(raw_files):
-        try:
-            metrics, tagged = process_ticket(ticket_path)
-            all_metrics.append(metrics)
-            
-            # Save tagged interactions
-            tagged_file = TAGGED_DIR / f"{ticket_path.stem}_tagged.json"
-            with open(tagged_file, 'w') as f:
-                json.dump(tagged, f, indent=2, default=str)
-            
+    archive_rows = []
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(raw_files) // (workers * 4))
+    worker = partial(process_and_save, per_ticket_files=per_ticket_files)
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(OUTPUT_FILE, 'w', newline='') as f:
+        writer = None
+        results = pool.map(worker, raw_files, chunksize=chunksize)
+        for i, (ticket_path, (metrics, tagged, error)) in enumerate(zip(raw_files, results)):
+            if error is not None:
+                print(f"Error processing {ticket_path.name}: {error}")
+            else:
+                all_metrics.append(metrics)
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(metrics), lineterminator='\n')
+                    writer.writeheader()
+                csv_row = metrics
+                for col in ('first_interaction_ts', 'last_interaction_ts'):
+                    if csv_row[col] is not None:
+                        csv_row = {**csv_row, col: csv_row[col].isoformat()}
+                writer.writerow(csv_row)
+                if tagged is not None:
+                    archive_rows.extend({'ticket_id': metrics['ticket_id'], **asdict(row)} for row in tagged)
+
             if (i + 1) % 20 == 0:
                 print(f"  Processed {i + 1}/{len(raw_files)} tickets...")
-                
-        except Exception as e:
-            print(f"Error processing {ticket_path.name}: {e}")
     
     # Create DataFrame
     metrics_df = pd.DataFrame(all_metrics)
     
-    # Summary stats
+    # Summary stats (one reduction per statistic kind rather than per column)
+    totals = metrics_df[SUMMARY_SUM_COLS].sum()
+    means = metrics_df[SUMMARY_MEAN_COLS].mean()
+    tickets_with_gaps = (metrics_df[['gaps_over_24h', 'gaps_over_48h']] > 0).sum()
+
     print("\n" + "=" * 60)
     print("TICKET_360 METRICS SUMMARY")
     print("=" * 60)
@@ -403,37 +616,47 @@ def main():
     print(f"\nTickets processed: {len(metrics_df)}")
     
     print(f"\nInteraction counts:")
-    print(f"  Total interactions: {metrics_df['total_interactions'].sum()}")
-    print(f"  AI interactions: {metrics_df['ai_count'].sum()} (Atlas: {metrics_df['atlas_count'].sum()}, Hermes: {metrics_df['hermes_count'].sum()})")
-    print(f"  Employee interactions: {metrics_df['employee_count'].sum()}")
-    print(f"  Customer interactions: {metrics_df['customer_count'].sum()}")
+    print(f"  Total interactions: {totals['total_interactions']}")
+    print(f"  AI interactions: {totals['ai_count']} (Atlas: {totals['atlas_count']}, Hermes: {totals['hermes_count']})")
+    print(f"  Employee interactions: {totals['employee_count']}")
+    print(f"  Customer interactions: {totals['customer_count']}")
     
     print(f"\nTime to first human response (hours):")
     valid_ttfh = metrics_df['time_to_first_human_seconds'].dropna()
     if len(valid_ttfh) > 0:
-        print(f"  Mean: {valid_ttfh.mean() / 3600:.1f}")
-        print(f"  Median: {valid_ttfh.median() / 3600:.1f}")
-        print(f"  P90: {valid_ttfh.quantile(0.9) / 3600:.1f}")
+        ttfh = valid_ttfh.describe(percentiles=[0.5, 0.9])
+        print(f"  Mean: {ttfh['mean'] / 3600:.1f}")
+        print(f"  Median: {ttfh['50%'] / 3600:.1f}")
+        print(f"  P90: {ttfh['90%'] / 3600:.1f}")
     
     print(f"\nMax gap between interactions (hours):")
-    print(f"  Mean: {metrics_df['max_gap_seconds'].mean() / 3600:.1f}")
-    print(f"  Tickets with gaps > 24h: {(metrics_df['gaps_over_24h'] > 0).sum()}")
-    print(f"  Tickets with gaps > 48h: {(metrics_df['gaps_over_48h'] > 0).sum()}")
+    print(f"  Mean: {means['max_gap_seconds'] / 3600:.1f}")
+    print(f"  Tickets with gaps > 24h: {tickets_with_gaps['gaps_over_24h']}")
+    print(f"  Tickets with gaps > 48h: {tickets_with_gaps['gaps_over_48h']}")
     
     print(f"\nAI Wall indicators:")
-    print(f"  Max consecutive AI (mean): {metrics_df['max_consecutive_ai'].mean():.1f}")
-    print(f"  Tickets with AI streak at start: {metrics_df['ai_streak_at_start'].sum()}")
-    print(f"  Mean AI msgs before human: {metrics_df['ai_only_before_human'].mean():.1f}")
+    print(f"  Max consecutive AI (mean): {means['max_consecutive_ai']:.1f}")
+    print(f"  Tickets with AI streak at start: {totals['ai_streak_at_start']}")
+    print(f"  Mean AI msgs before human: {means['ai_only_before_human']:.1f}")
     
     print(f"\nContent indicators:")
-    print(f"  Customer frustration keywords: {metrics_df['has_customer_frustration_keywords'].sum()}")
-    print(f"  Previous ticket references: {metrics_df['has_previous_ticket_reference'].sum()}")
-    print(f"  Repeated info requests: {metrics_df['has_repeated_info_request'].sum()}")
+    print(f"  Customer frustration keywords: {totals['has_customer_frustration_keywords']}")
+    print(f"  Previous ticket references: {totals['has_previous_ticket_reference']}")
+    print(f"  Repeated info requests: {totals['has_repeated_info_request']}")
     
-    # Save
-    metrics_df.to_csv(OUTPUT_FILE, index=False)
+    # The CSV was streamed above
     print(f"\n✓ Ticket metrics saved to: {OUTPUT_FILE}")
-    print(f"✓ Tagged interactions saved to: {TAGGED_DIR}/")
+    if per_ticket_files:
+        print(f"✓ Tagged interactions saved to: {TAGGED_DIR}/")
+    else:
+        pd.DataFrame(archive_rows).to_parquet(TAGGED_ARCHIVE, compression='zstd', index=False)
+        print(f"✓ Tagged interactions saved to: {TAGGED_ARCHIVE}")
+        # The two outputs are independent: per-ticket files from an earlier
+        # "files" run are neither updated nor removed here
+        stale = list(TAGGED_DIR.glob("*_tagged.json"))
+        if stale:
+            print(f"⚠ {len(stale)} per-ticket tagged files from an earlier run remain in {TAGGED_DIR}/ "
+                  f"and are now stale; {TAGGED_ARCHIVE.name} is current (delete them by hand)")
     
     return metrics_df
 
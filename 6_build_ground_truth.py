@@ -117,7 +117,8 @@ def main() -> None:
     )
     universe_df["Ticket ID"] = universe_df["Ticket ID"].astype(int)
     universe = set(universe_df["Ticket ID"].tolist())
-    universe_by_tid = {int(r["Ticket ID"]): r for _, r in universe_df.iterrows()}
+    # Plain per-ticket dicts (one bulk conversion instead of a Series per row)
+    universe_by_tid = dict(zip(universe_df["Ticket ID"].tolist(), universe_df.to_dict("records")))
 
     # Patterns.csv (two-row header)
     patterns_df = pd.read_csv(PATTERNS_FILE, header=[0, 1])
@@ -17,9 +17,12 @@ import argparse
 import csv
 import json
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from config import OUR_PATTERNS, POC_SAMPLE_CSV, POC_CSV_METRICS
 
 
@@ -57,7 +60,7 @@ def _read_csv_rows(path: Path) -> list[dict[str, str]]:
 
 
 def _load_results(result_file: Path) -> dict[str, Any]:
-    return json.loads(result_file.read_text())
+    return orjson.loads(result_file.read_bytes())
 
 
 def _as_bool(v: Any) -> bool:
@@ -107,6 +110,16 @@ def main() -> None:
                 continue
             metrics_by_tid[int(tid_raw)] = r
 
+    # Load all result files up front; reads are latency-bound on per-file
+    # open/stat, so overlap them across a small thread pool
+    result_files = {
+        tid: rf
+        for tid in sample_ticket_ids
+        if (rf := results_dir / f"ticket_{tid}.json").exists()
+    }
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results_by_tid = dict(zip(result_files, pool.map(_load_results, result_files.values())))
+
     # Build output rows
     out_rows: list[dict[str, Any]] = []
     missing_results: list[int] = []
@@ -117,12 +130,11 @@ def main() -> None:
         tid = int((r.get("ticket_id") or "0").strip() or "0")
         if tid == 0:
             continue
-        rf = results_dir / f"ticket_{tid}.json"
-        if not rf.exists():
+        data = results_by_tid.get(tid)
+        if data is None:
             missing_results.append(tid)
             continue
 
-        data = _load_results(rf)
         predicted: list[str] = []
         row_out: dict[str, Any] = {
             "ticket_id": tid,
@@ -22,6 +22,7 @@ DATA_DIR = REPO_ROOT / "data/poc"
 RAW_DIR = DATA_DIR / "raw"
 TAGGED_DIR = DATA_DIR / "tagged"
 LLM_RESULTS_DIR = DATA_DIR / "llm_results"
+CACHE_DIR = DATA_DIR / "cache"
 
 # Output files
 POC_SAMPLE_CSV = DATA_DIR / "poc_sample.csv"
@@ -32,6 +33,19 @@ GROUND_TRUTH_CSV = DATA_DIR / "ground_truth_expected.csv"
 GROUND_TRUTH_JSON = DATA_DIR / "ground_truth_expected.json"
 GROUND_TRUTH_OVERRIDES = DATA_DIR / "ground_truth_overrides.json"
 
+# Parsed copy of FULL_TICKET_DATA_CSV (rebuilt when the CSV changes)
+FULL_TICKET_DATA_PARQUET = CACHE_DIR / "full_ticket_data.parquet"
+
+# Typed Parquet copy of the sample, written next to the CSV and read by
+# load_poc_sample() (the CSV stays the interchange format for the web app and humans)
+POC_SAMPLE_PARQUET = POC_SAMPLE_CSV.with_suffix(".parquet")
+
+# Exact-match LLM response cache (SQLite), keyed by a hash of the full request
+LLM_CACHE_DB = CACHE_DIR / "llm_cache.sqlite"
+
+# Single-file alternative to the per-ticket tagged JSON (3_ticket_metrics.py --tagged-output parquet)
+TAGGED_ARCHIVE = TAGGED_DIR / "all_tagged.parquet"
+
 # =============================================================================
 # PATTERN DEFINITIONS
 # =============================================================================
@@ -106,16 +120,23 @@ CSV_CONTEXT_FIELDS = [
 
 # Ticket fetch API
 TICKET_API_URL = "https://s42d56zhik.execute-api.us-east-1.amazonaws.com/Prod/handler"
-TICKET_API_DELAY = 0.3  # seconds between requests
+TICKET_API_DELAY = 0.3  # seconds between requests (per worker)
+TICKET_API_WORKERS = 8  # concurrent fetch requests
 
 # LLM Configuration
 LLM_CONFIG = {
     "model": "gpt-5.2",
     "max_completion_tokens": 1800,
     "reasoning_effort": "medium",
-    "max_retries": 2,
+    "max_retries": 4,  # call_llm retries (the SDK's own retries are disabled there)
     "retry_delay_base": 0.6,
-    "call_delay": 0.35,  # seconds between calls
+    "max_workers": 8,  # concurrent detection requests
+    "rpm": None,  # requests per minute cap (None = unlimited)
+    "tpm": None,  # tokens per minute cap (None = unlimited)
+    "structured_output": False,  # strict json_schema response format (llm_detect --structured)
+    "cascade_reasoning_effort": "low",  # first-pass effort with llm_detect --cascade
+    "cache_max_entries": 100_000,  # response cache size; least frequently used evicted (None = unbounded)
+    "cache_ttl_days": None,  # response cache entry lifetime (None = never expire)
 }
 
 # Interaction formatting limits
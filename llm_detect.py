@@ -16,10 +16,12 @@ Uses GPT-5.2 to analyze support tickets and detect 6 quality patterns:
 from __future__ import annotations
 
 import argparse
-import json
-import time
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+
+import orjson
 
 from config import (
     RAW_DIR,
@@ -37,26 +39,40 @@ from utils import (
     format_interactions,
     format_csv_context,
     call_llm,
+    set_rate_limits,
+    submit_llm_batch,
+    collect_llm_batch,
 )
 
 
-def get_all_raw_ticket_ids() -> list[int]:
+def list_ticket_ids(directory: Path) -> set[int]:
     """
-    Dynamically get all ticket IDs from the raw directory.
-    This replaces the hardcoded ALL_TICKETS list.
+    Ticket IDs that have a ticket_<id>.json file in directory.
+
+    One directory listing instead of an exists() check per ticket.
     """
-    raw_files = list(RAW_DIR.glob("ticket_*.json"))
-    ticket_ids = []
-    for f in raw_files:
+    ticket_ids = set()
+    for f in directory.glob("ticket_*.json"):
         # Extract ticket ID from filename like "ticket_60005284.json"
         try:
-            tid = int(f.stem.replace("ticket_", ""))
-            ticket_ids.append(tid)
+            ticket_ids.add(int(f.stem.replace("ticket_", "")))
         except ValueError:
             continue
-    return sorted(ticket_ids)
+    return ticket_ids
 
 
+def get_all_raw_ticket_ids() -> list[int]:
+    """
+    Dynamically get all ticket IDs from the raw directory.
+    This replaces the hardcoded ALL_TICKETS list.
+    """
+    return sorted(list_ticket_ids(RAW_DIR))
+
+
+# Tags result files (_model) and names default output dirs (<model>-<version>);
+# bump together with any change to the prompts below
+PROMPT_VERSION = "v6"
+
 SYSTEM_PROMPT = """You are an expert support quality analyst evaluating Central Support performance.
 
 This run is **recall-first**:
@@ -74,9 +90,9 @@ Output requirements:
 """
 
 
-USER_PROMPT_TEMPLATE = """# Support Ticket Analysis (Recall-first)
-
-Ticket ID: {ticket_id}
+# Per-ticket block: used once in the single-ticket prompt, repeated in the
+# multi-ticket prompt
+TICKET_SECTION_TEMPLATE = """Ticket ID: {ticket_id}
 
 ## Structured CSV context (authoritative)
 {csv_context}
@@ -84,7 +100,10 @@ Ticket ID: {ticket_id}
 ## Interactions (chronological)
 {interactions}
 
----
+"""
+
+# Pattern definitions shared by both prompts (plain text, no placeholders)
+DECISION_RULES = """---
 
 # How to decide (v6 recall-first)
 
@@ -128,7 +147,20 @@ Mishandling criteria:
 - No acknowledgment of severity/urgency
 - Treating outage like routine support ticket
 
----
+"""
+
+
+SINGLE_TICKET_HEADER = "# Support Ticket Analysis (Recall-first)\n\n"
+
+# Several tickets in one request (--tickets-per-call > 1); the response is
+# demultiplexed by ticket_id
+MULTI_TICKET_HEADER = (
+    "# Support Ticket Analysis (Recall-first, {n_tickets} tickets)\n\n"
+    "Analyze each ticket below independently; do not carry evidence across tickets.\n\n"
+    "{tickets}"
+)
+
+OUTPUT_FORMAT = """---
 
 # Output format
 Return JSON with keys:
@@ -142,17 +174,82 @@ Each key maps to:
 }}
 """
 
+MULTI_TICKET_OUTPUT_FORMAT = """---
 
-def analyze_ticket(
+# Output format
+Return JSON with a single key "results": a list with exactly one entry per ticket above.
+
+Each entry has "ticket_id" (integer) plus the keys:
+AI_QUALITY_FAILURES, AI_WALL_LOOPING, IGNORING_CONTEXT, RESPONSE_DELAYS, PREMATURE_CLOSURE, P1_SEV1_MISHANDLING
+
+Each pattern key maps to:
+{{
+  "detected": true/false,
+  "reasoning": "...",
+  "evidence": ["quote 1", "quote 2"]
+}}
+"""
+
+USER_PROMPT_TEMPLATE = SINGLE_TICKET_HEADER + TICKET_SECTION_TEMPLATE + DECISION_RULES + OUTPUT_FORMAT
+BATCH_USER_PROMPT_TEMPLATE = MULTI_TICKET_HEADER + DECISION_RULES + MULTI_TICKET_OUTPUT_FORMAT
+
+# With structured outputs (--structured) the JSON schema is enforced by the
+# API, so the prose output-format block is left out of the prompt
+STRUCTURED_USER_PROMPT_TEMPLATE = SINGLE_TICKET_HEADER + TICKET_SECTION_TEMPLATE + DECISION_RULES
+STRUCTURED_BATCH_USER_PROMPT_TEMPLATE = MULTI_TICKET_HEADER + DECISION_RULES
+
+_PATTERN_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "detected": {"type": "boolean"},
+        "reasoning": {"type": "string"},
+        "evidence": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["detected", "reasoning", "evidence"],
+    "additionalProperties": False,
+}
+
+TICKET_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {p: _PATTERN_RESULT_SCHEMA for p in OUR_PATTERNS},
+    "required": list(OUR_PATTERNS),
+    "additionalProperties": False,
+}
+
+MULTI_TICKET_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"ticket_id": {"type": "integer"}, **TICKET_ANALYSIS_SCHEMA["properties"]},
+                "required": ["ticket_id", *OUR_PATTERNS],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["results"],
+    "additionalProperties": False,
+}
+
+
+def structured_response_format(n_tickets: int = 1) -> dict:
+    """Strict json_schema response_format for a single- or multi-ticket prompt."""
+    if n_tickets == 1:
+        name, schema = "ticket_analysis", TICKET_ANALYSIS_SCHEMA
+    else:
+        name, schema = "multi_ticket_analysis", MULTI_TICKET_ANALYSIS_SCHEMA
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+
+
+def build_user_prompt(
     ticket_id: int,
     csv_context_by_ticket: dict[int, dict[str, Any]],
     raw_dir: Path = RAW_DIR,
-) -> Optional[dict]:
-    """
-    Analyze a single ticket using the LLM.
-
-    Returns the LLM response dict with pattern detections, or None if failed.
-    """
+    structured: bool = False,
+) -> Optional[str]:
+    """Build the single-ticket user prompt, or None if the raw file is missing."""
     raw_file = raw_dir / f"ticket_{ticket_id}.json"
     if not raw_file.exists():
         return None
@@ -160,18 +257,329 @@ def analyze_ticket(
     interactions_text = format_interactions(raw_file)
     csv_context = format_csv_context(ticket_id, csv_context_by_ticket)
 
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    template = STRUCTURED_USER_PROMPT_TEMPLATE if structured else USER_PROMPT_TEMPLATE
+    return template.format(
         ticket_id=ticket_id,
         csv_context=csv_context,
         interactions=interactions_text,
     )
 
-    result = call_llm(
+
+def build_group_prompt(
+    ticket_ids: list[int],
+    csv_context_by_ticket: dict[int, dict[str, Any]],
+    raw_dir: Path = RAW_DIR,
+    structured: bool = False,
+) -> tuple[list[int], Optional[str]]:
+    """
+    Build one user prompt covering ticket_ids.
+
+    A single ticket uses the regular per-ticket prompt; several are packed
+    into BATCH_USER_PROMPT_TEMPLATE. Tickets without a raw file are left out.
+
+    Returns (ticket IDs in the prompt, prompt or None if there are none).
+    """
+    present = [tid for tid in ticket_ids if (raw_dir / f"ticket_{tid}.json").exists()]
+    if not present:
+        return present, None
+    if len(present) == 1:
+        return present, build_user_prompt(present[0], csv_context_by_ticket, raw_dir, structured)
+
+    sections = [
+        TICKET_SECTION_TEMPLATE.format(
+            ticket_id=tid,
+            csv_context=format_csv_context(tid, csv_context_by_ticket),
+            interactions=format_interactions(raw_dir / f"ticket_{tid}.json"),
+        )
+        for tid in present
+    ]
+    template = STRUCTURED_BATCH_USER_PROMPT_TEMPLATE if structured else BATCH_USER_PROMPT_TEMPLATE
+    return present, template.format(
+        n_tickets=len(present),
+        tickets="---\n\n".join(sections),
+    )
+
+
+def analyze_prompt(
+    ticket_ids: list[int],
+    user_prompt: str,
+    model: Optional[str] = None,
+    refresh_cache: bool = False,
+    structured: bool = False,
+    reasoning_effort: Optional[str] = None,
+) -> dict[int, Optional[dict]]:
+    """
+    Send a prompt from build_group_prompt() to one model (structured must
+    match the flag the prompt was built with).
+
+    Multi-ticket responses are split back out by ticket_id. Returns
+    {ticket_id: result dict or None (call failed or ticket absent from the
+    response)}.
+    """
+    response = call_llm(
         system_prompt=SYSTEM_PROMPT,
         user_prompt=user_prompt,
+        model=model,
+        max_completion_tokens=LLM_CONFIG["max_completion_tokens"] * len(ticket_ids),
+        reasoning_effort=reasoning_effort,
+        response_format=structured_response_format(len(ticket_ids)) if structured else None,
+        refresh_cache=refresh_cache,
     )
+    if len(ticket_ids) == 1:
+        return {ticket_ids[0]: response}
 
-    return result
+    results: dict[int, Optional[dict]] = dict.fromkeys(ticket_ids)
+    entries = response.get("results") if response else None
+    if not isinstance(entries, list):
+        return results
+
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            tid = int(entry.pop("ticket_id"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if tid in results:
+            results[tid] = entry
+    return results
+
+
+def analyze_ticket(
+    ticket_id: int,
+    csv_context_by_ticket: dict[int, dict[str, Any]],
+    raw_dir: Path = RAW_DIR,
+    refresh_cache: bool = False,
+    model: Optional[str] = None,
+    structured: bool = False,
+) -> Optional[dict]:
+    """
+    Analyze a single ticket using the LLM.
+
+    Returns the LLM response dict with pattern detections, or None if failed.
+    """
+    return analyze_tickets(
+        [ticket_id], csv_context_by_ticket, raw_dir, refresh_cache, model, structured
+    )[ticket_id]
+
+
+def analyze_tickets(
+    ticket_ids: list[int],
+    csv_context_by_ticket: dict[int, dict[str, Any]],
+    raw_dir: Path = RAW_DIR,
+    refresh_cache: bool = False,
+    model: Optional[str] = None,
+    structured: bool = False,
+) -> dict[int, Optional[dict]]:
+    """
+    Analyze several tickets in a single LLM request.
+
+    Returns {ticket_id: result dict or None (raw file missing, call failed,
+    or ticket absent from the response)}.
+    """
+    results: dict[int, Optional[dict]] = dict.fromkeys(ticket_ids)
+    present, user_prompt = build_group_prompt(ticket_ids, csv_context_by_ticket, raw_dir, structured)
+    if user_prompt is not None:
+        results.update(analyze_prompt(present, user_prompt, model, refresh_cache, structured))
+    return results
+
+
+def needs_escalation(result: Optional[dict]) -> bool:
+    """
+    Whether a low-effort (--cascade) result should be redone at full effort:
+    the call failed, any pattern was detected, or any reasoning is too thin
+    (< 30 chars) to trust a negative.
+    """
+    if result is None:
+        return True
+    for pattern in OUR_PATTERNS:
+        entry = result.get(pattern)
+        if not isinstance(entry, dict) or entry.get("detected") is True:
+            return True
+        if len(str(entry.get("reasoning") or "")) < 30:
+            return True
+    return False
+
+
+def detect_and_save(
+    ticket_ids: list[int],
+    present: list[int],
+    user_prompt: Optional[str],
+    model: str,
+    output_dir: Path,
+    refresh_cache: bool = False,
+    structured: bool = False,
+    cascade_effort: Optional[str] = None,
+) -> list[tuple[int, str, str]]:
+    """
+    Send one group prompt (from build_group_prompt()) to one model and write
+    the result files.
+
+    With cascade_effort, the prompt first goes out at that (cheaper)
+    reasoning effort; only if needs_escalation() for any ticket is it sent
+    again at the configured effort, whose results replace the first pass.
+
+    Returns (ticket_id, model, status) per ticket; see save_result() for
+    statuses.
+    """
+    results: dict[int, Optional[dict]] = dict.fromkeys(ticket_ids)
+    if user_prompt is not None:
+        results.update(analyze_prompt(
+            present, user_prompt, model, refresh_cache, structured, reasoning_effort=cascade_effort,
+        ))
+        if cascade_effort is not None and any(needs_escalation(results[tid]) for tid in present):
+            full = analyze_prompt(present, user_prompt, model, refresh_cache, structured)
+            # Keep a first-pass result where the full-effort call failed
+            results.update((tid, result) for tid, result in full.items() if result is not None)
+    return [
+        (tid, model, save_result(tid, model, result, output_dir))
+        for tid, result in results.items()
+    ]
+
+
+def save_result(ticket_id: int, model: str, result: Optional[dict], output_dir: Path) -> str:
+    """
+    Write one ticket's result file.
+
+    Returns "OK", "EMPTY" (no result) or "MALFORMED" (result has no pattern
+    keys; not saved).
+    """
+    if result is None:
+        return "EMPTY"
+    if not any(p in result for p in OUR_PATTERNS):
+        return "MALFORMED"
+    result["_model"] = f"{model}-{PROMPT_VERSION}"
+    result["_ticket_id"] = ticket_id
+    # Write-then-rename: a killed run never leaves a partial file that the
+    # "already done" check would skip
+    out = output_dir / f"ticket_{ticket_id}.json"
+    tmp = out.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, out)
+    return "OK"
+
+
+def run_concurrent(
+    ticket_ids: list[int],
+    csv_context_by_ticket: dict[int, dict[str, Any]],
+    outputs: dict[str, Path],
+    workers: int,
+    tickets_per_call: int = 1,
+    refresh_cache: bool = False,
+    structured: bool = False,
+    cascade_effort: Optional[str] = None,
+) -> Iterator[tuple[int, str, str]]:
+    """
+    Run detection with synchronous calls, yielding (ticket_id, model, status)
+    as each request completes.
+
+    Every (group, model) request is independent and network-bound, so they
+    are all overlapped across one thread pool: models run side by side (each
+    has its own rate limiter) rather than one model after another. A group's
+    prompt is built once and shared by all models that still need it.
+    """
+    per_call = max(1, tickets_per_call)
+    groups = [ticket_ids[i:i + per_call] for i in range(0, len(ticket_ids), per_call)]
+    done = {
+        model: set() if refresh_cache else list_ticket_ids(output_dir)
+        for model, output_dir in outputs.items()
+    }
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = []
+        for group in groups:
+            prompts: dict[tuple[int, ...], tuple[list[int], Optional[str]]] = {}
+            for model, output_dir in outputs.items():
+                todo = tuple(tid for tid in group if tid not in done[model])
+                if not todo:
+                    continue
+                if todo not in prompts:
+                    prompts[todo] = build_group_prompt(
+                        list(todo), csv_context_by_ticket, structured=structured,
+                    )
+                present, user_prompt = prompts[todo]
+                futures.append(pool.submit(
+                    detect_and_save, list(todo), present, user_prompt, model, output_dir,
+                    refresh_cache, structured, cascade_effort,
+                ))
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def run_batch(
+    ticket_ids: list[int],
+    csv_context_by_ticket: dict[int, dict[str, Any]],
+    outputs: dict[str, Path],
+    refresh_cache: bool = False,
+    structured: bool = False,
+    batch_id: Optional[str] = None,
+) -> list[tuple[int, str, str]]:
+    """
+    Run detection for all tickets through the OpenAI Batch API.
+
+    Submits one batch per model (one request per ticket, prompts built once
+    and shared), waits for them to finish (can take up to 24h), then writes
+    the result files. Returns (ticket_id, model, status) like detect_and_save().
+
+    With batch_id (single model only), nothing is submitted: that earlier
+    batch is collected instead and every result in it is written.
+    """
+    if batch_id is not None:
+        (model, output_dir), = outputs.items()
+        print(f"Waiting for batch {batch_id} ({model})...")
+        results = collect_llm_batch(batch_id)
+        return [
+            (int(custom_id), model, save_result(int(custom_id), model, result, output_dir))
+            for custom_id, result in results.items()
+        ]
+
+    todo = {}
+    for model, output_dir in outputs.items():
+        done = set() if refresh_cache else list_ticket_ids(output_dir)
+        todo[model] = [tid for tid in ticket_ids if tid not in done]
+    # Build every needed prompt up front, overlapping the raw-file reads
+    pending = set().union(*todo.values())
+    needed = [tid for tid in ticket_ids if tid in pending]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        prompts = dict(zip(needed, pool.map(
+            lambda tid: build_user_prompt(tid, csv_context_by_ticket, structured=structured),
+            needed,
+        )))
+
+    statuses = []
+    submitted = []
+    for model, output_dir in outputs.items():
+        batch_prompts = {}
+        for tid in todo[model]:
+            if prompts[tid] is None:
+                statuses.append((tid, model, "EMPTY"))
+            else:
+                batch_prompts[str(tid)] = (SYSTEM_PROMPT, prompts[tid])
+        if batch_prompts:
+            batch_id = submit_llm_batch(
+                batch_prompts,
+                model=model,
+                response_format=structured_response_format() if structured else None,
+            )
+            print(f"Submitted batch {batch_id} for {model} ({len(batch_prompts)} requests)")
+            print(f"  (if interrupted, resume with --models {model} --batch-id {batch_id})")
+            submitted.append((model, output_dir, batch_id, batch_prompts))
+
+    for model, output_dir, batch_id, batch_prompts in submitted:
+        print(f"Waiting for batch {batch_id} ({model})...")
+        results = collect_llm_batch(batch_id)
+        statuses.extend(
+            (int(custom_id), model, save_result(int(custom_id), model, results.get(custom_id), output_dir))
+            for custom_id in batch_prompts
+        )
+    return statuses
+
+
+def positive_float(value: str) -> float:
+    """argparse type for rate limits: a number greater than zero."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
 
 
 def parse_args() -> argparse.Namespace:
@@ -187,12 +595,20 @@ def parse_args() -> argparse.Namespace:
     p.add_argument(
         "--outdir",
         default=None,
-        help="Output directory for results (default: data/poc/llm_results/gpt-5.2-v6).",
+        help=f"Output directory for results (default: data/poc/llm_results/<model>-{PROMPT_VERSION}). "
+        f"With several --models, each model gets a <model>-{PROMPT_VERSION} subdirectory.",
+    )
+    p.add_argument(
+        "--models",
+        type=str,
+        default=None,
+        help=f"Comma-separated list of models to run (default: {LLM_CONFIG['model']}). "
+        "Each ticket's prompt is built once and sent to every model.",
     )
     p.add_argument(
         "--force",
         action="store_true",
-        help="Re-run even if output file already exists.",
+        help="Re-run even if output file already exists (also bypasses the LLM response cache).",
     )
     p.add_argument(
         "--tickets",
@@ -200,19 +616,71 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Comma-separated list of specific ticket IDs to process.",
     )
-    return p.parse_args()
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=LLM_CONFIG["max_workers"],
+        help=f"Concurrent LLM requests (default: {LLM_CONFIG['max_workers']}).",
+    )
+    p.add_argument(
+        "--tickets-per-call",
+        type=int,
+        default=1,
+        help="Pack this many tickets into each LLM request (default: 1). "
+        "Cuts request count under RPM limits; keep small (4-8) so the "
+        "combined interactions fit the context window.",
+    )
+    p.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit all tickets to the OpenAI Batch API (50%% cheaper, no RPM "
+        "limit, results within 24h) instead of calling synchronously. "
+        "One ticket per request; --workers/--tickets-per-call are ignored.",
+    )
+    p.add_argument(
+        "--batch-id",
+        default=None,
+        help="Collect an already submitted batch (from an interrupted --batch run) "
+        "instead of submitting a new one. Implies --batch; one model only.",
+    )
+    p.add_argument(
+        "--structured",
+        action=argparse.BooleanOptionalAction,
+        default=LLM_CONFIG["structured_output"],
+        help="Use strict json_schema structured outputs instead of a prose JSON "
+        "spec in the prompt (no parse failures, fewer prompt tokens).",
+    )
+    p.add_argument(
+        "--cascade",
+        action="store_true",
+        help=f"Run a first pass at reasoning effort '{LLM_CONFIG['cascade_reasoning_effort']}' and "
+        f"redo only tickets with a detection or thin reasoning at '{LLM_CONFIG['reasoning_effort']}' "
+        "(not with --batch).",
+    )
+    p.add_argument(
+        "--rpm",
+        type=positive_float,
+        default=LLM_CONFIG["rpm"],
+        help="Max LLM requests per minute per model, across all workers (default: unlimited).",
+    )
+    p.add_argument(
+        "--tpm",
+        type=positive_float,
+        default=LLM_CONFIG["tpm"],
+        help="Max LLM tokens per minute per model, across all workers (default: unlimited).",
+    )
+    args = p.parse_args()
+    if args.batch_id:
+        args.batch = True
+    if args.cascade and args.batch:
+        p.error("--cascade needs synchronous calls; it cannot be combined with --batch")
+    return args
 
 
 def main() -> None:
     ensure_dirs()
     args = parse_args()
-
-    # Determine output directory
-    if args.outdir:
-        output_dir = Path(args.outdir)
-    else:
-        output_dir = get_llm_output_dir()
-    output_dir.mkdir(parents=True, exist_ok=True)
+    set_rate_limits(args.rpm, args.tpm)
 
     # Load CSV context
     csv_context_by_ticket = load_csv_context()
@@ -232,50 +700,88 @@ def main() -> None:
             print("       Run 1_fetch_tickets.py first to fetch tickets.")
             return
 
+    # Determine output directory per model
+    models = [m.strip() for m in args.models.split(",") if m.strip()] if args.models else [LLM_CONFIG["model"]]
+    if len(models) == 1 and args.outdir:
+        outputs = {models[0]: Path(args.outdir)}
+    elif args.outdir:
+        outputs = {model: Path(args.outdir) / f"{model}-{PROMPT_VERSION}" for model in models}
+    else:
+        outputs = {model: get_llm_output_dir(f"{model}-{PROMPT_VERSION}") for model in models}
+    for output_dir in outputs.values():
+        output_dir.mkdir(parents=True, exist_ok=True)
+    if args.batch_id and len(models) > 1:
+        print("ERROR: --batch-id resumes a single model's batch; pass one --models value.")
+        return
+
     print(f"LLM Pattern Detection")
-    print(f"- Model: {LLM_CONFIG['model']}")
-    print(f"- Output: {output_dir}")
+    print(f"- Model: {', '.join(models)}")
+    print(f"- Output: {', '.join(str(d) for d in outputs.values())}")
     print(f"- Tickets: {len(ticket_ids)}")
+    print(f"- Workers: {args.workers}")
+    if args.batch:
+        print("- Mode: OpenAI Batch API")
+    elif args.tickets_per_call > 1:
+        print(f"- Tickets per call: {args.tickets_per_call}")
+    if args.structured:
+        print("- Response format: strict JSON schema")
+    if args.cascade:
+        print(f"- Reasoning cascade: {LLM_CONFIG['cascade_reasoning_effort']} -> {LLM_CONFIG['reasoning_effort']}")
     print("=" * 72)
 
-    # Filter to tickets that need processing
-    to_process = []
-    for tid in ticket_ids:
-        out = output_dir / f"ticket_{tid}.json"
-        if args.force or not out.exists():
-            to_process.append(tid)
-
-    print(f"Already done: {len(ticket_ids) - len(to_process)}")
-    print(f"To process:   {len(to_process)}")
+    # Filter to (ticket, model) pairs that need processing
+    pending = {}
+    for model, output_dir in outputs.items():
+        done = set() if args.force else list_ticket_ids(output_dir)
+        pending[model] = [tid for tid in ticket_ids if tid not in done]
+    n_jobs = sum(len(tids) for tids in pending.values())
+    needed = set().union(*pending.values())
+    to_process = [tid for tid in ticket_ids if tid in needed]
+
+    print(f"Already done: {len(ticket_ids) * len(models) - n_jobs}")
+    print(f"To process:   {n_jobs}")
+    missing_raw = needed - list_ticket_ids(RAW_DIR)
+    if missing_raw:
+        print(f"WARNING: {len(missing_raw)} ticket(s) have no raw file in {RAW_DIR} (will be EMPTY)")
     print()
 
+    if args.batch:
+        statuses = run_batch(
+            to_process, csv_context_by_ticket, outputs,
+            refresh_cache=args.force, structured=args.structured,
+            batch_id=args.batch_id,
+        )
+        n_jobs = len(statuses)
+    else:
+        statuses = run_concurrent(
+            to_process, csv_context_by_ticket, outputs,
+            workers=args.workers, tickets_per_call=args.tickets_per_call,
+            refresh_cache=args.force, structured=args.structured,
+            cascade_effort=LLM_CONFIG["cascade_reasoning_effort"] if args.cascade else None,
+        )
+
     ok = 0
     empty = 0
     malformed = 0
-    for i, tid in enumerate(to_process):
-        print(f"[{i+1}/{len(to_process)}] {tid}...", end=" ", flush=True)
-        result = analyze_ticket(tid, csv_context_by_ticket)
-        if result is None:
-            # analyze_ticket returned None (raw file missing or LLM call failed)
-            print("EMPTY (no result)")
+    for i, (tid, model, status) in enumerate(statuses):
+        label = f"{tid} [{model}]" if len(models) > 1 else f"{tid}"
+        prefix = f"[{i+1}/{n_jobs}] {label}..."
+        if status == "EMPTY":
+            print(f"{prefix} EMPTY (no result)")
             empty += 1
-        elif not any(p in result for p in OUR_PATTERNS):
+        elif status == "MALFORMED":
             # LLM returned a result but it doesn't have any pattern keys
-            # This is malformed - don't save it
-            print("MALFORMED (missing pattern keys)")
+            print(f"{prefix} MALFORMED (missing pattern keys)")
             malformed += 1
         else:
-            result["_model"] = f"{LLM_CONFIG['model']}-v6"
-            result["_ticket_id"] = tid
-            (output_dir / f"ticket_{tid}.json").write_text(json.dumps(result, indent=2))
-            print("OK")
+            print(f"{prefix} OK")
             ok += 1
-        time.sleep(LLM_CONFIG["call_delay"])
 
     print()
     print("=" * 72)
     print(f"Complete: {ok} success, {empty} failed, {malformed} malformed")
-    print(f"Total results files: {len(list(output_dir.glob('ticket_*.json')))}")
+    for model, output_dir in outputs.items():
+        print(f"Total results files ({model}): {len(list(output_dir.glob('ticket_*.json')))}")
 
 
 if __name__ == "__main__":
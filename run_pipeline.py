@@ -138,6 +138,7 @@ Examples:
   python run_pipeline.py --step detect      # Run only detection
   python run_pipeline.py --from detect      # Run from detection onwards
   python run_pipeline.py --skip fetch       # Skip fetch step
+  python run_pipeline.py --step detect --workers 16  # 16 concurrent LLM calls
 """,
     )
     p.add_argument(
@@ -175,6 +176,17 @@ Examples:
         default=None,
         help="Custom results directory for detect/eval/summarize steps",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Concurrent LLM requests in detect step (default: llm_detect.py default)",
+    )
+    p.add_argument(
+        "--batch",
+        action="store_true",
+        help="Run detect step through the OpenAI Batch API",
+    )
     return p.parse_args()
 
 
@@ -225,6 +237,10 @@ def main() -> None:
                 extra_args.append(f"--outdir={args.results_dir}")
             if args.force:
                 extra_args.append("--force")
+            if args.workers:
+                extra_args.append(f"--workers={args.workers}")
+            if args.batch:
+                extra_args.append("--batch")
 
         elif step_id == "eval":
             results_dir = args.results_dir or str(get_llm_output_dir())
@@ -0,0 +1,44 @@
+"""Tests for utils.llm_client.RateLimiter (run: python -m unittest discover tests)."""
+
+from __future__ import annotations
+
+import threading
+import unittest
+
+from utils.llm_client import RateLimiter
+
+
+def acquire_within(limiter: RateLimiter, timeout: float, tokens: int = 0) -> bool:
+    """Whether limiter.acquire(tokens) returns within timeout seconds."""
+    t = threading.Thread(target=limiter.acquire, args=(tokens,), daemon=True)
+    t.start()
+    t.join(timeout)
+    return not t.is_alive()
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_fractional_rpm_lets_a_request_through(self):
+        limiter = RateLimiter(rpm=0.5)
+        self.assertTrue(acquire_within(limiter, 1.0))
+        # The next request has to wait for the bucket to refill (~2 minutes)
+        self.assertFalse(acquire_within(limiter, 0.2))
+
+    def test_fractional_rpm_refills_to_one_request(self):
+        limiter = RateLimiter(rpm=0.5)
+        limiter._last -= 1000  # pretend a long idle period
+        limiter._refill()
+        self.assertEqual(limiter._requests, 1.0)
+
+    def test_unlimited_never_blocks(self):
+        limiter = RateLimiter()
+        self.assertTrue(acquire_within(limiter, 1.0, tokens=10**9))
+
+    def test_negative_limits_rejected(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(rpm=-1)
+        with self.assertRaises(ValueError):
+            RateLimiter(tpm=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
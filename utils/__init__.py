@@ -3,10 +3,12 @@ Shared utilities for the Kayako ticket analysis pipeline.
 """
 
 from utils.data_loader import (
+    load_full_ticket_data,
     load_csv_context,
     load_expected_labels,
     load_predicted_labels,
     load_ground_truth_ticket_ids,
+    load_poc_sample,
     load_poc_sample_ticket_ids,
     load_ticket_raw,
     clean_csv_value,
@@ -22,14 +24,20 @@ from utils.llm_client import (
     get_openai_client,
     call_llm,
     call_llm_raw,
+    parse_json_response,
+    set_rate_limits,
+    submit_llm_batch,
+    collect_llm_batch,
 )
 
 __all__ = [
     # Data loading
+    "load_full_ticket_data",
     "load_csv_context",
     "load_expected_labels",
     "load_predicted_labels",
     "load_ground_truth_ticket_ids",
+    "load_poc_sample",
     "load_poc_sample_ticket_ids",
     "load_ticket_raw",
     "clean_csv_value",
@@ -41,4 +49,8 @@ __all__ = [
     "get_openai_client",
     "call_llm",
     "call_llm_raw",
+    "parse_json_response",
+    "set_rate_limits",
+    "submit_llm_batch",
+    "collect_llm_batch",
 ]
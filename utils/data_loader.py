@@ -8,13 +8,20 @@ from __future__ import annotations
 
 import csv
 import json
+import os
 from pathlib import Path
 from typing import Any, Optional
 
+import orjson
+import pandas as pd
+import pyarrow.parquet as pq
+
 from config import (
     FULL_TICKET_DATA_CSV,
+    FULL_TICKET_DATA_PARQUET,
     GROUND_TRUTH_CSV,
     POC_SAMPLE_CSV,
+    POC_SAMPLE_PARQUET,
     RAW_DIR,
     CSV_CONTEXT_FIELDS,
     OUR_PATTERNS,
@@ -31,6 +38,38 @@ def clean_csv_value(v: Any) -> Optional[str]:
     return s
 
 
+def load_full_ticket_data(
+    columns: Optional[list[str]] = None,
+    ticket_ids: Optional[set[int]] = None,
+) -> pd.DataFrame:
+    """
+    Load Full_Ticket_Data as a DataFrame, via a Parquet cache.
+
+    The CSV is parsed once and written to FULL_TICKET_DATA_PARQUET; later loads
+    (from any script) read the typed, columnar copy instead of re-parsing the CSV.
+    The cache is rebuilt whenever the CSV is newer than it.
+
+    Args:
+        columns: Optional subset of columns to load. Names missing from the data
+            are ignored, so callers can pass a wish-list.
+        ticket_ids: Optional set of ticket IDs to keep. The filter is pushed down
+            to the Parquet reader, so non-matching rows are never materialized.
+    """
+    cache = FULL_TICKET_DATA_PARQUET
+    if not cache.exists() or cache.stat().st_mtime < FULL_TICKET_DATA_CSV.stat().st_mtime:
+        df = pd.read_csv(FULL_TICKET_DATA_CSV, engine="pyarrow")
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp, compression="zstd", index=False)
+        os.replace(tmp, cache)
+
+    if columns is not None:
+        available = set(pq.read_schema(cache).names)
+        columns = [c for c in columns if c in available]
+    filters = [("Ticket ID", "in", sorted(ticket_ids))] if ticket_ids is not None else None
+    return pd.read_parquet(cache, columns=columns, filters=filters)
+
+
 def load_csv_context(csv_file: Optional[Path] = None) -> dict[int, dict[str, Any]]:
     """
     Load a compact per-ticket context map from the authoritative CSV universe.
@@ -108,7 +147,7 @@ def load_predicted_labels(result_file: Path) -> set[str]:
 
     Returns a set of pattern labels that were detected=true.
     """
-    data = json.loads(result_file.read_text())
+    data = orjson.loads(result_file.read_bytes())
     pred: set[str] = set()
     for p in OUR_PATTERNS:
         block: Any = data.get(p)
@@ -141,6 +180,20 @@ def load_ground_truth_ticket_ids(gt_csv: Optional[Path] = None) -> list[int]:
     return sorted(set(ids))
 
 
+def load_poc_sample() -> pd.DataFrame:
+    """
+    Load the Phase 0 sample (built by 0_build_sample.py) as a DataFrame.
+
+    Reads the Parquet copy when it is at least as new as the CSV, otherwise
+    falls back to parsing the CSV.
+    """
+    if not POC_SAMPLE_CSV.exists():
+        raise FileNotFoundError(f"{POC_SAMPLE_CSV} not found. Run: python3 0_build_sample.py")
+    if POC_SAMPLE_PARQUET.exists() and POC_SAMPLE_PARQUET.stat().st_mtime >= POC_SAMPLE_CSV.stat().st_mtime:
+        return pd.read_parquet(POC_SAMPLE_PARQUET)
+    return pd.read_csv(POC_SAMPLE_CSV)
+
+
 def load_poc_sample_ticket_ids(sample_csv: Optional[Path] = None) -> list[int]:
     """
     Load Phase 0 sample ticket IDs (built by 0_build_sample.py).
@@ -177,5 +230,4 @@ def load_ticket_raw(ticket_id: int, raw_dir: Optional[Path] = None) -> Optional[
     if not raw_file.exists():
         return None
 
-    with open(raw_file, "r") as f:
-        return json.load(f)
+    return orjson.loads(raw_file.read_bytes())
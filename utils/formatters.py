@@ -6,10 +6,12 @@ Consolidates format_interactions() and format_csv_context() from v2-v6 scripts.
 
 from __future__ import annotations
 
-import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
+import orjson
+
 from config import CSV_CONTEXT_FIELDS, INTERACTION_LIMITS
 
 
@@ -131,15 +133,17 @@ def _smart_select_interactions(
             else:
                 break
 
-        # Truncate last section from the END (keep most recent)
+        # Truncate last section from the END (keep most recent); collected
+        # newest-first and flipped once, instead of O(n) insert(0, ...) each
         truncated_last = []
         last_used = 0
         for chunk in reversed(last_section):
             if last_used + len(chunk) <= last_budget:
-                truncated_last.insert(0, chunk)
+                truncated_last.append(chunk)
                 last_used += len(chunk)
             else:
                 break
+        truncated_last.reverse()
 
         result = truncated_first + ["\n...[middle interactions omitted]...\n"] + truncated_last
         return result, True
@@ -188,6 +192,9 @@ def format_interactions(
     - Last 60%: Recent interactions (most important for pattern detection)
     - Middle 20%: Sampled if space allows
 
+    The formatted text is memoized per (file, mtime, limits), so running
+    several models/prompts over the same ticket parses and formats it once.
+
     Args:
         raw_file: Path to the raw ticket JSON file
         max_total_chars: Maximum total characters for all interactions
@@ -202,33 +209,23 @@ def format_interactions(
     max_per = max_chars_per_interaction or limits["max_chars_per_interaction"]
     trunc_at = truncate_at or limits["truncate_at"]
 
-    with open(raw_file, "r") as f:
-        ticket_data = json.load(f)
-
-    ticket = (ticket_data.get("payload") or {}).get("ticket") or {}
-    interactions = ticket.get("interactions") or []
-
-    requester = (ticket.get("metadata") or {}).get("requester") or {}
-    requester_name = requester.get("full_name") or "Unknown Customer"
-
-    header = f"Customer: {requester_name}\n"
-
-    # Stored reverse-chronological; we want chronological
-    interactions = list(reversed(interactions))
-
-    # Format all interactions first
-    formatted = []
-    for inter in interactions:
-        chunk = _format_single_interaction(inter, max_per, trunc_at)
-        if chunk:
-            formatted.append(chunk)
-
-    # Smart selection to fit budget (minus header)
-    selected, was_truncated = _smart_select_interactions(
-        formatted, max_chars - len(header)
+    raw_file = Path(raw_file)
+    return _format_interactions_cached(
+        raw_file, raw_file.stat().st_mtime_ns, max_chars, max_per, trunc_at
     )
 
-    return header + "".join(selected)
+
+@lru_cache(maxsize=512)
+def _format_interactions_cached(
+    raw_file: Path,
+    mtime_ns: int,
+    max_chars: int,
+    max_per: int,
+    trunc_at: int,
+) -> str:
+    """Load and format one raw ticket file (mtime_ns keys out stale entries)."""
+    ticket_data = orjson.loads(raw_file.read_bytes())
+    return format_interactions_from_dict(ticket_data, max_chars, max_per, trunc_at)
 
 
 def format_interactions_from_dict(
@@ -256,12 +253,10 @@ def format_interactions_from_dict(
 
     header = f"Customer: {requester_name}\n"
 
-    # Stored reverse-chronological; we want chronological
-    interactions = list(reversed(interactions))
-
-    # Format all interactions first
+    # Stored reverse-chronological; walk it backwards (no reversed copy) so
+    # the formatted chunks come out chronological
     formatted = []
-    for inter in interactions:
+    for inter in reversed(interactions):
         chunk = _format_single_interaction(inter, max_per, trunc_at)
         if chunk:
             formatted.append(chunk)
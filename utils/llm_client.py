@@ -1,21 +1,30 @@
 """
 LLM client utilities for the Kayako ticket analysis pipeline.
 
-Provides OpenAI client factory and retry-enabled call wrapper.
+Provides OpenAI client factory, retry-enabled call wrapper and Batch API helpers.
 """
 
 from __future__ import annotations
 
+import hashlib
+import itertools
 import json
 import logging
 import os
+import random
+import re
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Optional
 
 from dotenv import load_dotenv
 import openai
+import orjson
 
-from config import LLM_CONFIG
+from config import LLM_CACHE_DB, LLM_CONFIG
 
 load_dotenv()
 
@@ -23,9 +32,261 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+class RateLimiter:
+    """
+    Thread-safe token bucket for requests-per-minute and tokens-per-minute.
+
+    Both buckets refill continuously and start full. acquire() blocks until
+    one request and the estimated token count fit under both limits. A limit
+    of None (or 0) disables that bucket. The request bucket holds at least
+    one request, so a fractional rpm (e.g. 0.5 = one request every 2 minutes)
+    still lets requests through.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        if (rpm is not None and rpm < 0) or (tpm is not None and tpm < 0):
+            raise ValueError(f"Rate limits must not be negative (rpm={rpm}, tpm={tpm})")
+        self.rpm = rpm or None
+        self.tpm = tpm or None
+        self._max_requests = max(1.0, self.rpm or 0)
+        self._requests = self._max_requests if self.rpm else 0.0
+        self._tokens = float(self.tpm or 0)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        if self.rpm:
+            self._requests = min(self._max_requests, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until one request using ~tokens tokens may be sent."""
+        if self.tpm:
+            # A single request larger than the whole bucket would never fit
+            tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait == 0.0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+            time.sleep(wait)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once a request's real usage is known."""
+        if not self.tpm:
+            return
+        with self._lock:
+            self._refill()
+            # Refund an over-estimate, or charge the shortfall (may go negative)
+            self._tokens = min(self.tpm, self._tokens + min(estimated, self.tpm) - actual)
+
+
+# One limiter per model (OpenAI quotas are per model), shared by all call_llm()
+# calls in this process; unlimited until configured, e.g. from --rpm/--tpm
+_rate_limits: tuple[Optional[float], Optional[float]] = (LLM_CONFIG.get("rpm"), LLM_CONFIG.get("tpm"))
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def set_rate_limits(rpm: Optional[float] = None, tpm: Optional[float] = None) -> None:
+    """Set the per-model request/token rate limits used by call_llm()."""
+    global _rate_limits
+    with _rate_limiters_lock:
+        _rate_limits = (rpm, tpm)
+        _rate_limiters.clear()
+
+
+def _get_rate_limiter(model: str) -> RateLimiter:
+    """Return the limiter for model, creating it with the current limits."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(model)
+        if limiter is None:
+            limiter = _rate_limiters[model] = RateLimiter(*_rate_limits)
+        return limiter
+
+
+def estimate_request_tokens(system_prompt: str, user_prompt: str, max_completion_tokens: int) -> int:
+    """Rough token cost of a request (~4 chars/token plus the completion budget)."""
+    return (len(system_prompt) + len(user_prompt)) // 4 + max_completion_tokens
+
+
+# A JSON object inside a ```json ... ``` fence (models occasionally wrap
+# output in markdown even in json_object mode)
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+
+def parse_json_response(content: str) -> Any:
+    """
+    Parse a model response as JSON.
+
+    Fast path: the whole body is JSON (json_object mode). Fallback: the first
+    fenced ```json block. Raises json.JSONDecodeError if neither parses.
+    """
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        match = _JSON_FENCE_RE.search(content)
+        if match is None:
+            raise
+        return orjson.loads(match.group(1))
+
+
+def _cache_key(**request: Any) -> str:
+    """SHA-256 of everything that determines a response (model, prompts, options)."""
+    blob = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# In-process LRU in front of the disk cache: raw response bodies by key, so a
+# repeated request in the same run is a dict lookup (only hits are kept)
+_MEMORY_CACHE_SIZE = 1024
+_memory_cache: OrderedDict[str, str] = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def _memory_cache_put(key: str, content: str) -> None:
+    with _memory_cache_lock:
+        _memory_cache[key] = content
+        _memory_cache.move_to_end(key)
+        if len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+# sqlite3 connections can't be shared across threads: one per worker thread
+_cache_local = threading.local()
+
+
+def _cache_db() -> sqlite3.Connection:
+    """Return this thread's connection to the response cache, opening it on first use."""
+    conn = getattr(_cache_local, "conn", None)
+    if conn is None:
+        LLM_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; WAL lets concurrent workers (and processes) read while one writes
+        conn = sqlite3.connect(LLM_CACHE_DB, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+                "hits INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+            if "hits" not in columns:
+                # Cache file from before eviction: entries count as new today
+                conn.execute("ALTER TABLE responses ADD COLUMN hits INTEGER NOT NULL DEFAULT 0")
+                conn.execute("ALTER TABLE responses ADD COLUMN created REAL NOT NULL DEFAULT 0")
+                conn.execute("UPDATE responses SET created = ?", (time.time(),))
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_lfu ON responses (hits, created)")
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            conn.close()
+            raise
+        _cache_local.conn = conn
+    return conn
+
+
+def _cache_cutoff() -> float:
+    """Creation time before which entries are expired (0 = no TTL)."""
+    ttl_days = LLM_CONFIG.get("cache_ttl_days")
+    return time.time() - ttl_days * 86400 if ttl_days else 0.0
+
+
+def _cache_read(key: str) -> Optional[dict]:
+    """Return the cached parsed response for key, or None on a miss."""
+    with _memory_cache_lock:
+        content = _memory_cache.get(key)
+        if content is not None:
+            _memory_cache.move_to_end(key)
+    try:
+        if content is None:
+            db = _cache_db()
+            row = db.execute(
+                "SELECT content FROM responses WHERE key = ? AND created >= ?",
+                (key, _cache_cutoff()),
+            ).fetchone()
+            if row is None:
+                return None
+            # Use count for LFU eviction (hits served from memory aren't counted)
+            db.execute("UPDATE responses SET hits = hits + 1 WHERE key = ?", (key,))
+            content = row[0]
+            _memory_cache_put(key, content)
+        # Parsed fresh each time: callers annotate the returned dict
+        return parse_json_response(content)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not read LLM cache entry {key}: {e}")
+        return None
+    except json.JSONDecodeError:
+        return None
+
+
+# Eviction scans the table, so it runs on this process's first cache write and
+# then every _CACHE_EVICT_EVERY writes, not after each one
+_CACHE_EVICT_EVERY = 100
+_cache_write_count = itertools.count()
+
+
+def _cache_evict(db: sqlite3.Connection) -> None:
+    """
+    Drop expired entries and, beyond LLM_CONFIG["cache_max_entries"], the
+    least frequently used ones (oldest first among equal hit counts).
+    """
+    cutoff = _cache_cutoff()
+    if cutoff:
+        db.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+    max_entries = LLM_CONFIG.get("cache_max_entries")
+    if max_entries:
+        (n_entries,) = db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if n_entries > max_entries:
+            db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY hits, created LIMIT ?)",
+                (n_entries - max_entries,),
+            )
+
+
+def _cache_write(key: str, content: str) -> None:
+    """
+    Store the raw response body (replacing any earlier entry for key).
+
+    Periodically evicts via _cache_evict(), so the table can briefly exceed
+    cache_max_entries by up to _CACHE_EVICT_EVERY entries per process.
+    """
+    _memory_cache_put(key, content)
+    try:
+        db = _cache_db()
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, content, hits, created) VALUES (?, ?, 0, ?)",
+            (key, content, time.time()),
+        )
+        if next(_cache_write_count) % _CACHE_EVICT_EVERY == 0:
+            _cache_evict(db)
+    except (OSError, sqlite3.Error) as e:
+        # A cache write failure must not lose the response itself
+        logger.warning(f"Could not write LLM cache entry {key}: {e}")
+
+
+@lru_cache(maxsize=1)
 def get_openai_client() -> openai.OpenAI:
     """
-    Create and return an OpenAI client.
+    Return the shared OpenAI client, creating it on first use.
+
+    The client is thread-safe and keeps a pooled HTTP connection, so every
+    call reuses it instead of paying a new TCP/TLS handshake.
 
     Raises RuntimeError if OPENAI_API_KEY is not set.
     """
@@ -80,17 +341,24 @@ def _get_retry_delay(error: Exception, base_delay: float, attempt: int) -> float
     """
     Calculate retry delay based on error type and attempt number.
 
-    Rate limit errors get longer delays (5x base).
-    Other errors use exponential backoff.
+    A Retry-After (or retry-after-ms) header on the error response wins.
+    Otherwise: exponential backoff with jitter, capped at 30s. Rate limit
+    errors start from a longer delay (5x base).
     """
-    multiplier = attempt + 1
-
-    if isinstance(error, openai.RateLimitError):
-        # Rate limits need longer waits
-        return base_delay * 5 * multiplier
-
-    # Standard exponential backoff for other errors
-    return base_delay * 1.5 * multiplier
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            if headers.get("retry-after-ms"):
+                return min(float(headers["retry-after-ms"]) / 1000, 60.0)
+            if headers.get("retry-after"):
+                return min(float(headers["retry-after"]), 60.0)
+        except ValueError:
+            # HTTP-date form or garbage: fall back to backoff
+            pass
+    multiplier = 5 if isinstance(error, openai.RateLimitError) else 1.5
+    delay = base_delay * multiplier * (2 ** attempt)
+    return min(delay + random.uniform(0, base_delay), 30.0)
 
 
 def call_llm(
@@ -102,14 +370,24 @@ def call_llm(
     max_retries: Optional[int] = None,
     retry_delay_base: Optional[float] = None,
     response_format: Optional[dict] = None,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
 ) -> Optional[dict]:
     """
     Call the LLM with smart retry logic and return parsed JSON response.
 
+    Successful responses are cached in the LLM_CACHE_DB SQLite file, keyed by a
+    SHA-256 of (model, prompts, max tokens, reasoning effort, response format),
+    so an identical request is answered without an API call. Any prompt change
+    yields a new key. The cache is bounded by LFU eviction (see _cache_evict()).
+
     Retry behavior:
     - Non-retryable errors (auth, bad request): Fail immediately
     - Rate limit errors: Retry with longer delays (5x)
-    - Server errors: Retry with exponential backoff
+    - Server errors: Retry with exponential backoff (with jitter, max 30s)
+    - A Retry-After header from the API overrides the backoff delay
+    - Every attempt first waits on the model's shared RPM/TPM limiter, which
+      is then corrected with the response's actual token usage
     - Empty responses: Do NOT retry (likely model refusal)
     - JSON parse errors: Retry (might be transient)
 
@@ -122,6 +400,8 @@ def call_llm(
         max_retries: Number of retries (defaults to LLM_CONFIG["max_retries"])
         retry_delay_base: Base delay between retries (defaults to LLM_CONFIG["retry_delay_base"])
         response_format: Response format dict (defaults to {"type": "json_object"})
+        use_cache: Read/write the on-disk response cache
+        refresh_cache: Skip cache reads (still writes the fresh response)
 
     Returns:
         Parsed JSON dict from the response, or None if failed.
@@ -134,10 +414,28 @@ def call_llm(
     _retry_delay = retry_delay_base or config["retry_delay_base"]
     _format = response_format or {"type": "json_object"}
 
-    client = get_openai_client()
+    if use_cache:
+        key = _cache_key(
+            model=_model,
+            system=system_prompt,
+            user=user_prompt,
+            max_completion_tokens=_max_tokens,
+            reasoning_effort=_reasoning,
+            response_format=_format,
+        )
+        if not refresh_cache:
+            cached = _cache_read(key)
+            if cached is not None:
+                return cached
+
+    # SDK retries off: this loop retries (through the rate limiter) itself
+    client = get_openai_client().with_options(max_retries=0)
     last_err: Optional[Exception] = None
+    est_tokens = estimate_request_tokens(system_prompt, user_prompt, _max_tokens)
+    rate_limiter = _get_rate_limiter(_model)
 
     for attempt in range(_retries + 1):
+        rate_limiter.acquire(est_tokens)
         try:
             resp = client.chat.completions.create(
                 model=_model,
@@ -149,6 +447,8 @@ def call_llm(
                 reasoning_effort=_reasoning,
                 response_format=_format,
             )
+            if resp.usage is not None:
+                rate_limiter.settle(est_tokens, resp.usage.total_tokens)
             content = resp.choices[0].message.content
 
             # Empty response - don't retry, this is likely a refusal or content filter
@@ -158,7 +458,7 @@ def call_llm(
 
             # Try to parse JSON
             try:
-                return json.loads(content)
+                parsed = parse_json_response(content)
             except json.JSONDecodeError as e:
                 # JSON parse error - worth retrying (might be transient)
                 last_err = e
@@ -167,6 +467,10 @@ def call_llm(
                     time.sleep(_retry_delay * (attempt + 1))
                 continue
 
+            if use_cache:
+                _cache_write(key, content)
+            return parsed
+
         except Exception as e:
             last_err = e
 
@@ -208,6 +512,9 @@ def call_llm_raw(
     _format = response_format or {"type": "json_object"}
 
     client = get_openai_client()
+    rate_limiter = _get_rate_limiter(_model)
+    est_tokens = estimate_request_tokens(system_prompt, user_prompt, _max_tokens)
+    rate_limiter.acquire(est_tokens)
 
     try:
         resp = client.chat.completions.create(
@@ -220,6 +527,142 @@ def call_llm_raw(
             reasoning_effort=_reasoning,
             response_format=_format,
         )
+        if resp.usage is not None:
+            rate_limiter.settle(est_tokens, resp.usage.total_tokens)
         return resp.choices[0].message.content
     except Exception:
         return None
+
+
+# Terminal states of an OpenAI batch job
+_BATCH_DONE_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def submit_llm_batch(
+    prompts: dict[str, tuple[str, str]],
+    model: Optional[str] = None,
+    max_completion_tokens: Optional[int] = None,
+    reasoning_effort: Optional[str] = None,
+    response_format: Optional[dict] = None,
+) -> str:
+    """
+    Submit chat requests to the OpenAI Batch API (50% cheaper, no RPM limit).
+
+    Args:
+        prompts: {custom_id: (system_prompt, user_prompt)}
+        model, max_completion_tokens, reasoning_effort, response_format:
+            Same defaults as call_llm()
+
+    Returns:
+        The batch ID (pass to collect_llm_batch()).
+    """
+    config = LLM_CONFIG
+    body_defaults = {
+        "model": model or config["model"],
+        "max_completion_tokens": max_completion_tokens or config["max_completion_tokens"],
+        "reasoning_effort": reasoning_effort or config["reasoning_effort"],
+        "response_format": response_format or {"type": "json_object"},
+    }
+    lines = [
+        orjson.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                **body_defaults,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            },
+        })
+        for custom_id, (system_prompt, user_prompt) in prompts.items()
+    ]
+
+    client = get_openai_client()
+    input_file = client.files.create(
+        file=("batch_requests.jsonl", b"\n".join(lines) + b"\n"),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def _batch_body_cache_key(body: dict) -> str:
+    """The call_llm() cache key for a Batch API chat request body."""
+    system_prompt, user_prompt = (message["content"] for message in body["messages"])
+    return _cache_key(
+        model=body["model"],
+        system=system_prompt,
+        user=user_prompt,
+        max_completion_tokens=body["max_completion_tokens"],
+        reasoning_effort=body["reasoning_effort"],
+        response_format=body["response_format"],
+    )
+
+
+def collect_llm_batch(
+    batch_id: str,
+    poll_interval: float = 30.0,
+    use_cache: bool = True,
+) -> dict[str, Optional[dict]]:
+    """
+    Wait for a batch submitted with submit_llm_batch() and parse its results.
+
+    Polls until the batch reaches a terminal state, then downloads the output
+    file. Returns {custom_id: parsed JSON dict, or None if that request failed
+    or returned empty/invalid JSON}. Requests missing from the output are
+    simply absent from the dict.
+
+    With use_cache, each usable response is also stored in the response
+    cache under the key call_llm() would use for the same request (read
+    back from the batch's input file), so a later synchronous run of the
+    same prompts makes no API calls.
+    """
+    client = get_openai_client()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _BATCH_DONE_STATES:
+            break
+        counts = batch.request_counts
+        if counts is not None:
+            logger.info(f"Batch {batch_id}: {batch.status} ({counts.completed}/{counts.total} done)")
+        time.sleep(poll_interval)
+
+    if batch.status != "completed":
+        logger.error(f"Batch {batch_id} ended with status {batch.status}")
+
+    results: dict[str, Optional[dict]] = {}
+    if not batch.output_file_id:
+        return results
+
+    cache_keys: dict[str, str] = {}
+    if use_cache and batch.input_file_id:
+        for line in client.files.content(batch.input_file_id).text.splitlines():
+            if line.strip():
+                request = orjson.loads(line)
+                cache_keys[request["custom_id"]] = _batch_body_cache_key(request["body"])
+
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logger.warning(f"Batch request {custom_id} failed: {record.get('error') or response.get('status_code')}")
+            results[custom_id] = None
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            results[custom_id] = parse_json_response(content) if content and content.strip() else None
+            if results[custom_id] is not None and custom_id in cache_keys:
+                _cache_write(cache_keys[custom_id], content)
+        except (KeyError, IndexError, TypeError, json.JSONDecodeError) as e:
+            logger.warning(f"Batch request {custom_id} returned unusable content: {e}")
+            results[custom_id] = None
+    return results